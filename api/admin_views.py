@@ -14,6 +14,9 @@ import os
 from dotenv import load_dotenv
 load_dotenv()  # Ensure environment variables are loaded
 
+# Characters drawn for generated bot passwords
+PASSWORD_ALPHABET = string.ascii_letters + string.digits
+
 
 @api_view(['POST'])
 @permission_classes([AllowAny])  # Allow any user to access this endpoint
@@ -46,7 +49,7 @@ def create_bot_user(request):
     
     try:
         # Generate a random password for the bot
-        password = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(16))
+        password = ''.join(secrets.choice(PASSWORD_ALPHABET) for _ in range(16))
         
         # Create the user
         user = User.objects.create_user(
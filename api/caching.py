@@ -0,0 +1,74 @@
+"""
+Short-lived response caching for hot API feeds
+"""
+
+from functools import wraps
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+# Seconds a rendered feed page stays cached
+FEED_CACHE_TIMEOUT = 30
+
+
+def _generation_key(scope):
+    return f'feed:generation:{scope}'
+
+
+def feed_cache_key(request, scopes):
+    """Cache key for a feed page, tied to the viewer and the current generation of each scope it reads"""
+    generations = cache.get_many([_generation_key(scope) for scope in scopes])
+    stamp = '.'.join(str(generations.get(_generation_key(scope), 0)) for scope in scopes)
+    # Pages carry the viewer's own votes, so each user gets their own entries
+    viewer = request.user.pk if request.user.is_authenticated else 'anon'
+    return f'feed:{stamp}:{viewer}:{request.get_full_path()}'
+
+
+def invalidate_feeds(*scopes):
+    """Retire every cached page of the given feed scopes by bumping their generation"""
+    for scope in scopes:
+        key = _generation_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def post_feed_scopes(post):
+    """Feed scopes whose pages show the given post's counts"""
+    return (f'community:{post.community.name}', f'user:{post.author.username}')
+
+
+def comment_feed_scopes(comment):
+    """Feed scopes whose pages show the given comment: its author's, and its parent's author's when nested"""
+    scopes = (f'user:{comment.author.username}',)
+    if comment.parent_comment_id:
+        scopes += (f'user:{comment.parent_comment.author.username}',)
+    return scopes
+
+
+def viewer_scope(user):
+    """Scope covering every feed page rendered for this user, which carry their own votes"""
+    return f'viewer:{user.pk}'
+
+
+def cache_feed(*scope_templates):
+    """Cache a feed view's successful responses; scope templates are formatted with the URL kwargs"""
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            scopes = [template.format(**kwargs) for template in scope_templates]
+            if request.user.is_authenticated:
+                scopes.append(viewer_scope(request.user))
+            key = feed_cache_key(request, scopes)
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+            
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, FEED_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,107 @@
+"""
+Pagination classes for API feeds
+"""
+
+import orjson
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class FeedCursorPagination(CursorPagination):
+    """Keyset pagination that follows each feed's own ordering, with id as the tiebreaker"""
+    ordering = ('-created_at', '-id')
+    
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(queryset.query.order_by or queryset.model._meta.ordering)
+        if not ordering or not all(isinstance(field, str) for field in ordering):
+            return self.ordering
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            ordering += ('-id',)
+        return ordering
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        # Same flow as CursorPagination, except the position covers every ordering column.
+        # DRF keys on the first column alone and falls back to a capped offset for ties,
+        # which never gets past a run of more than offset_cutoff equal scores.
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+        
+        if reverse:
+            queryset = queryset.order_by(*[
+                field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering
+            ])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        
+        if current_position is not None:
+            queryset = queryset.filter(self._beyond_position(current_position, reverse))
+        
+        # Fetch one extra row to learn whether another page follows
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = list(results[:self.page_size])
+        
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+        
+        if reverse:
+            # The query ran backwards, so put the page back in feed order
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+        
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        
+        return self.page
+    
+    def _beyond_position(self, position, reverse):
+        """Rows strictly past a position in (reversed) feed order, compared on every ordering column"""
+        try:
+            values = orjson.loads(position)
+        except orjson.JSONDecodeError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        
+        # (a, b, c) past (x, y, z) means a past x, or a == x and b past y, or ...
+        condition = Q()
+        equal_so_far = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            condition |= equal_so_far & Q(**{f'{name}__{lookup}': value})
+            equal_so_far &= Q(**{name: value})
+        return condition
+    
+    def _get_position_from_instance(self, instance, ordering):
+        fields = [field.lstrip('-') for field in ordering]
+        if isinstance(instance, dict):
+            values = [instance[field] for field in fields]
+        else:
+            values = [getattr(instance, field) for field in fields]
+        return orjson.dumps(values).decode()
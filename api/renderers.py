@@ -0,0 +1,21 @@
+"""
+Faster JSON rendering for API responses
+"""
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSON renderer backed by orjson, falling back to DRF's encoder for unusual types"""
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        
+        return orjson.dumps(data, default=JSONEncoder().default, option=options)
@@ -1,5 +1,163 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import models
+from django.db.models import Count, Q, Sum
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
 from core.models import CustomUser, Community, Post, Comment, Vote
+from .voting import content_type_id
+
+# Replies serialized under each comment; the rest are flagged via has_more_replies
+MAX_REPLIES_PER_LEVEL = 20
+
+# Comments at this depth are rendered without their replies
+MAX_REPLY_DEPTH = 5
+
+# Seconds an active community's pk stays cached for post creation
+COMMUNITY_CACHE_TIMEOUT = 60
+
+
+def community_cache_key(name):
+    """Cache key for the pk of the active community with the given name"""
+    return f'community:{name}:pk'
+
+
+# Columns read for each reply when assembling comment trees
+REPLY_VALUES = (
+    'id', 'content', 'post_id', 'parent_comment_id', 'upvotes', 'downvotes', 'score',
+    'depth_level', 'created_at', 'updated_at', 'author__id', 'author__username',
+    'author__is_bot', 'author__created_at', 'author__last_active',
+)
+
+# Shared formatter so reply timestamps match the serializer fields
+_datetime_field = serializers.DateTimeField()
+
+
+def _format_datetime(value):
+    return _datetime_field.to_representation(value)
+
+
+def _attribute(name):
+    """Getter that copies a plain model attribute into the output"""
+    return lambda serializer, obj: getattr(obj, name)
+
+
+def _timestamp(name):
+    """Getter that formats a datetime attribute like DRF's DateTimeField"""
+    return lambda serializer, obj: _format_datetime(getattr(obj, name))
+
+
+def serialize_user(user):
+    """Render a user in the UserSerializer layout"""
+    return {
+        'id': user.id,
+        'username': user.username,
+        'is_bot': user.is_bot,
+        'created_at': _format_datetime(user.created_at),
+        'last_active': _format_datetime(user.last_active),
+    }
+
+
+class FlatRepresentationMixin:
+    """Build output from precomputed (field, getter) pairs instead of DRF's per-field pipeline"""
+    field_getters = {}
+    
+    @classmethod
+    def output_getters(cls):
+        # Resolved once per class, so subclasses with narrower Meta.fields never read the rest
+        if '_output_getters' not in cls.__dict__:
+            cls._output_getters = tuple((name, cls.field_getters[name]) for name in cls.Meta.fields)
+        return cls._output_getters
+    
+    def to_representation(self, instance):
+        return {name: getter(self, instance) for name, getter in self.output_getters()}
+
+
+def load_user_votes(context, model, object_ids):
+    """Map object id to the requesting user's vote on it, for a batch of objects"""
+    request = context.get('request')
+    user = getattr(request, 'user', None)
+    if not object_ids or user is None or not user.is_authenticated:
+        return {}
+    return dict(Vote.objects.filter(
+        user=user, content_type_id=content_type_id(model), object_id__in=object_ids
+    ).values_list('object_id', 'vote_type'))
+
+
+def group_replies(comments):
+    """Bucket reply rows by parent comment id, keeping their query order"""
+    children_by_parent = defaultdict(list)
+    for row in comments.values(*REPLY_VALUES):
+        children_by_parent[row['parent_comment_id']].append(row)
+    return children_by_parent
+
+
+def replies_below(comment_ids):
+    """Live replies under the given comments, walked with a recursive CTE down to the rendered depth"""
+    comment_ids = list(comment_ids)
+    table = Comment._meta.db_table
+    placeholders = ', '.join(['%s'] * len(comment_ids))
+    # One level past MAX_REPLY_DEPTH is kept so has_more_replies stays accurate at the cutoff
+    thread_sql = f'''
+        WITH RECURSIVE thread (id, depth_level) AS (
+            SELECT id, depth_level FROM {table}
+            WHERE parent_comment_id IN ({placeholders}) AND is_deleted = %s
+            UNION ALL
+            SELECT reply.id, reply.depth_level FROM {table} reply
+            JOIN thread ON reply.parent_comment_id = thread.id
+            WHERE reply.is_deleted = %s AND thread.depth_level <= %s
+        )
+        SELECT id FROM thread
+    '''
+    return Comment.objects.filter(
+        id__in=RawSQL(thread_sql, [*comment_ids, False, False, MAX_REPLY_DEPTH])
+    )
+
+
+def tree_comment_ids(context):
+    """Ids of every reply row already loaded into the serializer context"""
+    children_by_parent = context.get('children_by_parent', {})
+    return [row['id'] for rows in children_by_parent.values() for row in rows]
+
+
+def with_reply_count(comments):
+    """Annotate comments with their number of live direct replies"""
+    return comments.annotate(reply_count=Count('replies', filter=Q(replies__is_deleted=False)))
+
+
+def reply_limit(depth_level):
+    """How many replies are rendered under a comment at this depth"""
+    return MAX_REPLIES_PER_LEVEL if depth_level < MAX_REPLY_DEPTH else 0  # Limit nesting depth for API
+
+
+def serialize_reply(row, children_by_parent, user_votes):
+    """Render a reply row and its own replies in the CommentSerializer layout"""
+    children = children_by_parent.get(row['id'], [])
+    limit = reply_limit(row['depth_level'])
+    return {
+        'id': row['id'],
+        'content': row['content'],
+        'author': {
+            'id': row['author__id'],
+            'username': row['author__username'],
+            'is_bot': row['author__is_bot'],
+            'created_at': _format_datetime(row['author__created_at']),
+            'last_active': _format_datetime(row['author__last_active']),
+        },
+        'post': row['post_id'],
+        'parent_comment': row['parent_comment_id'],
+        'upvotes': row['upvotes'],
+        'downvotes': row['downvotes'],
+        'score': row['score'],
+        'depth_level': row['depth_level'],
+        'created_at': _format_datetime(row['created_at']),
+        'updated_at': _format_datetime(row['updated_at']),
+        'replies': [serialize_reply(child, children_by_parent, user_votes) for child in children[:limit]],
+        'has_more_replies': len(children) > limit,
+        'user_vote': user_votes.get(row['id']),
+    }
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -28,23 +186,43 @@ class UserDetailSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'last_active']
     
+    def to_representation(self, instance):
+        """Compute all profile stats with one aggregate query per content type"""
+        post_stats = instance.posts.filter(is_deleted=False).aggregate(
+            total=Count('id'),
+            score=Coalesce(Sum('score'), 0),
+            communities=Count('community', distinct=True)
+        )
+        comment_stats = instance.comments.filter(is_deleted=False).aggregate(
+            total=Count('id'),
+            score=Coalesce(Sum('score'), 0)
+        )
+        self._stats = {
+            'total_posts': post_stats['total'],
+            'total_comments': comment_stats['total'],
+            'total_post_score': post_stats['score'],
+            'total_comment_score': comment_stats['score'],
+            'communities_posted_in': post_stats['communities'],
+        }
+        return super().to_representation(instance)
+    
     def get_total_posts(self, obj):
-        return obj.posts.filter(is_deleted=False).count()
+        return self._stats['total_posts']
     
     def get_total_comments(self, obj):
-        return obj.comments.filter(is_deleted=False).count()
+        return self._stats['total_comments']
     
     def get_total_post_score(self, obj):
-        return sum(post.score for post in obj.posts.filter(is_deleted=False))
+        return self._stats['total_post_score']
     
     def get_total_comment_score(self, obj):
-        return sum(comment.score for comment in obj.comments.filter(is_deleted=False))
+        return self._stats['total_comment_score']
     
     def get_total_score(self, obj):
-        return self.get_total_post_score(obj) + self.get_total_comment_score(obj)
+        return self._stats['total_post_score'] + self._stats['total_comment_score']
     
     def get_communities_posted_in(self, obj):
-        return obj.posts.filter(is_deleted=False).values('community').distinct().count()
+        return self._stats['communities_posted_in']
 
 
 class CommunitySerializer(serializers.ModelSerializer):
@@ -60,47 +238,150 @@ class CommunitySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'member_count', 'post_count']
 
 
-class PostSerializer(serializers.ModelSerializer):
+class VotedListSerializer(serializers.ListSerializer):
+    """List serializer that loads the requesting user's votes for the whole page in one query"""
+    
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.Manager) else data)
+        if 'user_votes' not in self.context:
+            self.context['user_votes'] = load_user_votes(
+                self.context, self.child.Meta.model, [item.id for item in items]
+            )
+        return [self.child.to_representation(item) for item in items]
+
+
+class PostSerializer(FlatRepresentationMixin, serializers.ModelSerializer):
     """Serializer for post data"""
     author = UserSerializer(read_only=True)
     community_name = serializers.CharField(source='community.name', read_only=True)
+    user_vote = serializers.SerializerMethodField()
+    
+    field_getters = {
+        'id': _attribute('id'),
+        'title': _attribute('title'),
+        'content': _attribute('content'),
+        'url': _attribute('url'),
+        'author': lambda serializer, obj: serialize_user(obj.author),
+        'community': _attribute('community_id'),
+        'community_name': lambda serializer, obj: obj.community.name,
+        'upvotes': _attribute('upvotes'),
+        'downvotes': _attribute('downvotes'),
+        'score': _attribute('score'),
+        'comment_count': _attribute('comment_count'),
+        'created_at': _timestamp('created_at'),
+        'updated_at': _timestamp('updated_at'),
+        'user_vote': lambda serializer, obj: serializer.get_user_vote(obj),
+    }
     
     class Meta:
         model = Post
+        list_serializer_class = VotedListSerializer
         fields = [
             'id', 'title', 'content', 'url', 'author', 'community',
             'community_name', 'upvotes', 'downvotes', 'score',
-            'comment_count', 'created_at', 'updated_at'
+            'comment_count', 'created_at', 'updated_at', 'user_vote'
         ]
         read_only_fields = [
             'id', 'author', 'upvotes', 'downvotes', 'score',
             'comment_count', 'created_at', 'updated_at'
         ]
+    
+    def get_user_vote(self, obj):
+        """The requesting user's vote on this post, or None"""
+        if 'user_votes' not in self.context:
+            self.context['user_votes'] = load_user_votes(self.context, Post, [obj.id])
+        return self.context['user_votes'].get(obj.id)
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class PostListSerializer(PostSerializer):
+    """Serializer for post feeds, leaving out the post body"""
+    
+    class Meta(PostSerializer.Meta):
+        fields = [field for field in PostSerializer.Meta.fields if field != 'content']
+
+
+class CommentListSerializer(serializers.ListSerializer):
+    """List serializer that loads the reply trees under the page in one query"""
+    
+    def to_representation(self, data):
+        comments = list(data.all() if isinstance(data, models.Manager) else data)
+        if 'children_by_parent' not in self.context:
+            # Comments annotated with reply_count=0 need no reply rows at all
+            parent_ids = [comment.id for comment in comments if getattr(comment, 'reply_count', None) != 0]
+            self.context['children_by_parent'] = group_replies(replies_below(parent_ids)) if parent_ids else {}
+        if 'user_votes' not in self.context:
+            self.context['user_votes'] = load_user_votes(
+                self.context, Comment, [comment.id for comment in comments] + tree_comment_ids(self.context)
+            )
+        return [self.child.to_representation(comment) for comment in comments]
+
+
+class CommentSerializer(FlatRepresentationMixin, serializers.ModelSerializer):
     """Serializer for comment data"""
     author = UserSerializer(read_only=True)
     replies = serializers.SerializerMethodField()
+    has_more_replies = serializers.SerializerMethodField()
+    user_vote = serializers.SerializerMethodField()
+    
+    field_getters = {
+        'id': _attribute('id'),
+        'content': _attribute('content'),
+        'author': lambda serializer, obj: serialize_user(obj.author),
+        'post': _attribute('post_id'),
+        'parent_comment': _attribute('parent_comment_id'),
+        'upvotes': _attribute('upvotes'),
+        'downvotes': _attribute('downvotes'),
+        'score': _attribute('score'),
+        'depth_level': _attribute('depth_level'),
+        'created_at': _timestamp('created_at'),
+        'updated_at': _timestamp('updated_at'),
+        'replies': lambda serializer, obj: serializer.get_replies(obj),
+        'has_more_replies': lambda serializer, obj: serializer.get_has_more_replies(obj),
+        'user_vote': lambda serializer, obj: serializer.get_user_vote(obj),
+    }
     
     class Meta:
         model = Comment
+        list_serializer_class = CommentListSerializer
         fields = [
             'id', 'content', 'author', 'post', 'parent_comment',
             'upvotes', 'downvotes', 'score', 'depth_level',
-            'created_at', 'updated_at', 'replies'
+            'created_at', 'updated_at', 'replies', 'has_more_replies', 'user_vote'
         ]
         read_only_fields = [
             'id', 'author', 'upvotes', 'downvotes', 'score',
             'depth_level', 'created_at', 'updated_at'
         ]
     
+    def _get_children(self, obj):
+        """Direct replies to a comment, loading its reply tree on first use"""
+        if getattr(obj, 'reply_count', None) == 0:
+            return []
+        if 'children_by_parent' not in self.context:
+            self.context['children_by_parent'] = group_replies(replies_below([obj.id]))
+        return self.context['children_by_parent'].get(obj.id, [])
+    
     def get_replies(self, obj):
-        """Get nested replies for a comment"""
-        if obj.depth_level < 5:  # Limit nesting depth for API
-            replies = obj.replies.filter(is_deleted=False)
-            return CommentSerializer(replies, many=True, context=self.context).data
-        return []
+        """Get nested replies for a comment from the preloaded reply rows"""
+        replies = self._get_children(obj)[:reply_limit(obj.depth_level)]
+        user_votes = self._get_user_votes(obj)
+        return [serialize_reply(row, self.context['children_by_parent'], user_votes) for row in replies]
+    
+    def _get_user_votes(self, obj):
+        """The requesting user's votes on this comment and its loaded replies"""
+        if 'user_votes' not in self.context:
+            self.context['user_votes'] = load_user_votes(
+                self.context, Comment, [obj.id] + tree_comment_ids(self.context)
+            )
+        return self.context['user_votes']
+    
+    def get_has_more_replies(self, obj):
+        """Whether replies exist beyond the ones included in this response"""
+        return len(self._get_children(obj)) > reply_limit(obj.depth_level)
+    
+    def get_user_vote(self, obj):
+        """The requesting user's vote on this comment, or None"""
+        return self._get_user_votes(obj).get(obj.id)
 
 
 class VoteSerializer(serializers.ModelSerializer):
@@ -120,11 +401,20 @@ class PostCreateSerializer(serializers.ModelSerializer):
     
     def validate_community_name(self, value):
         """Validate that the community exists and is active"""
-        try:
-            community = Community.objects.get(name=value, is_active=True)
-            return community
-        except Community.DoesNotExist:
-            raise serializers.ValidationError(f"Community '{value}' does not exist or is inactive")
+        # Only the pk is cached (cleared in api.signals). The row is re-read on every use, so renames
+        # and deactivations made with queryset.update(), which skip the signals, still apply.
+        key = community_cache_key(value)
+        community_id = cache.get(key)
+        community = None
+        if community_id is not None:
+            community = Community.objects.filter(pk=community_id, name=value, is_active=True).first()
+        if community is None:
+            community = Community.objects.filter(name=value, is_active=True).first()
+            if community is None:
+                cache.delete(key)
+                raise serializers.ValidationError(f"Community '{value}' does not exist or is inactive")
+            cache.set(key, community.pk, COMMUNITY_CACHE_TIMEOUT)
+        return community
     
     def create(self, validated_data):
         """Create a new post"""
@@ -0,0 +1,25 @@
+"""
+Signal handlers that keep API caches in step with the database
+"""
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import receiver
+
+from core.models import Community
+from .serializers import community_cache_key
+
+
+@receiver(pre_save, sender=Community)
+def clear_community_cache(sender, instance, **kwargs):
+    """Drop the cached lookups for a community's previous and new names before it changes"""
+    names = {instance.name}
+    if instance.pk is not None:
+        names.update(Community.objects.filter(pk=instance.pk).values_list('name', flat=True))
+    cache.delete_many([community_cache_key(name) for name in names])
+
+
+@receiver(post_delete, sender=Community)
+def clear_deleted_community_cache(sender, instance, **kwargs):
+    """Drop the cached lookup for a deleted community"""
+    cache.delete(community_cache_key(instance.name))
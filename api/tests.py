@@ -0,0 +1,273 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+
+from core.models import Comment, Community, CustomUser, Post
+from .serializers import community_cache_key
+
+
+class FeedPaginationTests(TestCase):
+    """Cursor pagination over feeds with long runs of tied sort keys"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = CustomUser.objects.create_user(username='author', password='pw')
+        cls.community = Community.objects.create(name='general', display_name='General', created_by=cls.author)
+        # More tied scores than DRF's offset_cutoff, all sharing one timestamp as well
+        Post.objects.bulk_create(
+            Post(title=f'Post {i}', author=cls.author, community=cls.community) for i in range(1127)
+        )
+        Post.objects.update(created_at=Post.objects.first().created_at)
+    
+    def setUp(self):
+        cache.clear()
+    
+    def walk(self, url):
+        """Follow a feed's links to the end and return every row seen"""
+        rows = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            rows.extend(data['results'])
+            url = data['next']
+            self.assertLessEqual(len(rows), 1127, 'pagination did not terminate')
+        return rows
+    
+    def test_score_sorted_feed_walks_to_the_end(self):
+        rows = self.walk('/api/communities/general/posts/')
+        self.assertEqual(len(rows), 1127)
+        self.assertEqual(len({row['id'] for row in rows}), 1127)
+    
+    def test_top_sorted_user_feed_walks_to_the_end(self):
+        rows = self.walk('/api/users/author/posts/?sort=top')
+        self.assertEqual(len({row['id'] for row in rows}), 1127)
+    
+    def test_previous_links_walk_back_to_the_start(self):
+        response = self.client.get('/api/communities/general/posts/')
+        first_page = [row['id'] for row in response.json()['results']]
+        second = self.client.get(response.json()['next']).json()
+        
+        back = self.client.get(second['previous']).json()
+        self.assertEqual([row['id'] for row in back['results']], first_page)
+        self.assertIsNone(back['previous'])
+    
+    def test_malformed_cursor_is_rejected(self):
+        response = self.client.get('/api/communities/general/posts/?cursor=cD1ub3Rqc29u')
+        self.assertEqual(response.status_code, 404)
+
+
+class ApiKeyAuthenticationTests(TestCase):
+    """Bearer API keys for bot accounts"""
+    
+    def setUp(self):
+        self.bot = CustomUser.objects.create_user(username='bot', password='pw', is_bot=True)
+    
+    def auth_status(self, api_key):
+        return self.client.get('/api/users/bot/pending_replies/', HTTP_AUTHORIZATION=f'Bearer {api_key}').status_code
+    
+    def test_issued_key_authenticates(self):
+        self.assertEqual(self.auth_status(self.bot.api_key), 200)
+    
+    def test_key_rotated_with_queryset_update_authenticates(self):
+        CustomUser.objects.filter(pk=self.bot.pk).update(api_key='rotated-key')
+        self.assertEqual(self.auth_status('rotated-key'), 200)
+        self.assertEqual(self.auth_status(self.bot.api_key), 403)
+
+
+class FeedCacheTests(TestCase):
+    """Cached feed pages and the writes that retire them"""
+    
+    def setUp(self):
+        cache.clear()
+        self.alice = CustomUser.objects.create_user(username='alice', password='pw', is_bot=True)
+        self.bob = CustomUser.objects.create_user(username='bob', password='pw', is_bot=True)
+        self.community = Community.objects.create(name='general', display_name='General', created_by=self.alice)
+        self.post = Post.objects.create(title='Hello', author=self.alice, community=self.community)
+    
+    def get(self, url, user=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {user.api_key}'} if user else {}
+        return self.client.get(url, **headers).json()
+    
+    def post_as(self, user, url, data):
+        return self.client.post(url, data, content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {user.api_key}')
+    
+    def test_pages_are_served_from_the_cache(self):
+        self.get('/api/communities/general/posts/')
+        Post.objects.filter(pk=self.post.pk).update(title='Edited behind the cache')
+        
+        self.assertEqual(self.get('/api/communities/general/posts/')['results'][0]['title'], 'Hello')
+    
+    def test_vote_retires_the_community_feed_and_the_voters_pages(self):
+        self.get('/api/posts/')
+        self.get('/api/posts/', self.bob)
+        self.get('/api/communities/general/posts/')
+        
+        self.post_as(self.bob, f'/api/posts/{self.post.pk}/vote/', {'vote_type': 'up'})
+        
+        self.assertEqual(self.get('/api/communities/general/posts/')['results'][0]['score'], 1)
+        self.assertEqual(self.get('/api/posts/', self.bob)['results'][0]['user_vote'], 'up')
+        # Other readers of the site-wide feed keep their page until it expires
+        self.assertEqual(self.get('/api/posts/')['results'][0]['score'], 0)
+    
+    def test_new_post_retires_the_site_wide_feed(self):
+        self.get('/api/posts/')
+        self.post_as(self.bob, '/api/posts/', {'title': 'Second', 'content': 'Body', 'community_name': 'general'})
+        
+        self.assertEqual(len(self.get('/api/posts/')['results']), 2)
+    
+    def test_reply_retires_the_parent_authors_comment_feed(self):
+        post = Post.objects.create(title="Bob's post", author=self.bob, community=self.community)
+        comment = Comment.objects.create(content='First', author=self.alice, post=post)
+        self.assertEqual(self.get('/api/users/alice/comments/')['results'][0]['replies'], [])
+        
+        self.post_as(self.bob, f'/api/comments/{comment.pk}/reply/', {'content': 'Reply'})
+        
+        replies = self.get('/api/users/alice/comments/')['results'][0]['replies']
+        self.assertEqual([reply['content'] for reply in replies], ['Reply'])
+    
+    def test_post_edit_retires_its_feeds(self):
+        for url in ('/api/posts/', '/api/communities/general/posts/', '/api/users/alice/posts/'):
+            self.get(url)
+        
+        self.client.patch(
+            f'/api/posts/{self.post.pk}/', {'title': 'Edited'},
+            content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {self.alice.api_key}'
+        )
+        
+        for url in ('/api/posts/', '/api/communities/general/posts/', '/api/users/alice/posts/'):
+            self.assertEqual(self.get(url)['results'][0]['title'], 'Edited')
+    
+    def test_post_delete_retires_its_feeds(self):
+        for url in ('/api/posts/', '/api/communities/general/posts/', '/api/users/alice/posts/'):
+            self.get(url)
+        
+        self.client.delete(f'/api/posts/{self.post.pk}/', HTTP_AUTHORIZATION=f'Bearer {self.alice.api_key}')
+        
+        for url in ('/api/posts/', '/api/communities/general/posts/', '/api/users/alice/posts/'):
+            self.assertEqual(self.get(url)['results'], [])
+    
+    def test_comment_edit_and_delete_retire_the_authors_feed(self):
+        comment = Comment.objects.create(content='First', author=self.alice, post=self.post)
+        self.get('/api/users/alice/comments/')
+        
+        self.client.patch(
+            f'/api/comments/{comment.pk}/', {'content': 'Edited'},
+            content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {self.alice.api_key}'
+        )
+        self.assertEqual(self.get('/api/users/alice/comments/')['results'][0]['content'], 'Edited')
+        
+        self.client.delete(f'/api/comments/{comment.pk}/', HTTP_AUTHORIZATION=f'Bearer {self.alice.api_key}')
+        self.assertEqual(self.get('/api/users/alice/comments/')['results'], [])
+    
+    def test_web_writes_retire_the_api_feeds(self):
+        self.get('/api/posts/')
+        self.get('/api/communities/general/posts/')
+        # A separate client keeps the feed reads anonymous
+        web = Client()
+        web.force_login(self.bob)
+        
+        web.post('/create-post/', {'title': 'From the web', 'content': 'Body', 'community': self.community.pk})
+        self.assertEqual(len(self.get('/api/posts/')['results']), 2)
+        
+        web.post(f'/vote/post/{self.post.pk}/', {'vote_type': 'up'})
+        scores = {row['id']: row['score'] for row in self.get('/api/communities/general/posts/')['results']}
+        self.assertEqual(scores[self.post.pk], 1)
+        
+        web.post(f'/posts/{self.post.pk}/comment/', {'content': 'Web comment'})
+        self.assertEqual(self.get('/api/users/bob/comments/')['results'][0]['content'], 'Web comment')
+
+
+class CommunityLookupCacheTests(TestCase):
+    """Cached community lookups for post creation"""
+    
+    def setUp(self):
+        cache.clear()
+        self.bot = CustomUser.objects.create_user(username='bot', password='pw', is_bot=True)
+        self.community = Community.objects.create(name='general', display_name='General', created_by=self.bot)
+    
+    def create_post(self, community_name):
+        return self.client.post(
+            '/api/posts/', {'title': 'Hello', 'content': 'Body', 'community_name': community_name},
+            content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {self.bot.api_key}'
+        ).status_code
+    
+    def test_only_the_pk_is_cached(self):
+        self.assertEqual(self.create_post('general'), 201)
+        self.assertEqual(cache.get(community_cache_key('general')), self.community.pk)
+    
+    def test_rename_retires_the_old_name(self):
+        self.create_post('general')
+        self.community.name = 'renamed'
+        self.community.save()
+        
+        self.assertEqual(self.create_post('general'), 400)
+        self.assertEqual(self.create_post('renamed'), 201)
+    
+    def test_rename_with_queryset_update_retires_the_old_name(self):
+        self.create_post('general')
+        Community.objects.filter(pk=self.community.pk).update(name='renamed')
+        
+        self.assertEqual(self.create_post('general'), 400)
+    
+    def test_deactivation_with_queryset_update_is_honoured(self):
+        self.create_post('general')
+        Community.objects.filter(pk=self.community.pk).update(is_active=False)
+        
+        self.assertEqual(self.create_post('general'), 400)
+
+
+class BatchTests(TestCase):
+    """Several API calls run through one batch request"""
+    
+    def setUp(self):
+        cache.clear()
+        self.bot = CustomUser.objects.create_user(username='bot', password='pw', is_bot=True)
+        community = Community.objects.create(name='general', display_name='General', created_by=self.bot)
+        self.post = Post.objects.create(title='Hello', author=self.bot, community=community)
+        Comment.objects.create(content='First', author=self.bot, post=self.post)
+    
+    def batch(self, calls):
+        return self.client.post(
+            '/api/batch/', {'calls': calls},
+            content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {self.bot.api_key}'
+        )
+    
+    def test_result_feeds_a_later_call_as_a_query_parameter(self):
+        response = self.batch([
+            {'id': 'posts', 'path': '/api/posts/'},
+            {'id': 'comments', 'path': '/api/comments/', 'input_from': 'posts', 'input_field': 'results.0.id', 'param': 'post'},
+        ])
+        
+        comments = response.json()['responses'][1]
+        self.assertEqual(comments['status'], 200)
+        self.assertEqual([comment['content'] for comment in comments['body']['results']], ['First'])
+    
+    def test_result_fills_an_input_placeholder_in_a_later_path(self):
+        response = self.batch([
+            {'id': 'posts', 'path': '/api/posts/'},
+            {
+                'id': 'comment', 'method': 'POST', 'path': '/api/posts/{input}/comment/',
+                'input_from': 'posts', 'input_field': 'results.0.id', 'body': {'content': 'Second'},
+            },
+        ])
+        
+        self.assertEqual(response.json()['responses'][1]['status'], 201)
+        self.assertTrue(self.post.comments.filter(content='Second', author=self.bot).exists())
+    
+    def test_missing_input_fails_the_dependent_call(self):
+        response = self.batch([
+            {'id': 'posts', 'path': '/api/posts/'},
+            {'id': 'comments', 'path': '/api/comments/', 'input_from': 'posts', 'input_field': 'results.5.id', 'param': 'post'},
+        ])
+        
+        self.assertEqual(response.json()['responses'][1]['status'], 424)
+    
+    def test_too_many_calls_are_rejected(self):
+        response = self.batch([{'path': '/api/posts/'}] * 11)
+        self.assertEqual(response.status_code, 400)
+    
+    def test_nested_batch_is_rejected(self):
+        response = self.batch([{'method': 'POST', 'path': '/api/batch/', 'body': {'calls': []}}])
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['responses'][0]['status'], 400)
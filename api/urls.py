@@ -13,6 +13,9 @@ urlpatterns = [
     # Router URLs (includes all CRUD operations and custom actions)
     path('', include(router.urls)),
     
+    # Run several API calls in a single request
+    path('batch/', views.batch, name='batch'),
+    
     # Admin endpoints
     path('admin/create-bot-user/', admin_views.create_bot_user, name='create-bot-user'),
 ]
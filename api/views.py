@@ -3,40 +3,52 @@ from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django.shortcuts import get_object_or_404
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import QueryDict
+from django.urls import resolve, Resolver404
 from django.db.models import F
 from django.contrib.auth.models import User
 from django.contrib.auth import get_user_model
+import io
 import secrets
 import string
 
-from core.models import Community, Post, Comment, Vote, CustomUser
+from core.models import Community, Post, Comment, CustomUser
 from .serializers import (
-    CommunitySerializer, PostSerializer, CommentSerializer,
+    CommunitySerializer, PostSerializer, PostListSerializer, CommentSerializer,
     PostCreateSerializer, CommentCreateSerializer, VoteSerializer,
-    UserSerializer, UserDetailSerializer
+    UserSerializer, UserDetailSerializer, group_replies, replies_below, with_reply_count
 )
+from .caching import cache_feed, comment_feed_scopes, invalidate_feeds, post_feed_scopes, viewer_scope
+from .renderers import ORJSONRenderer
+from .voting import handle_vote
+
+
+# Upper bound on sub-requests a single batch call may run
+BATCH_MAX_CALLS = 10
 
 
 class CommunityViewSet(viewsets.ReadOnlyModelViewSet):
     """API viewset for communities"""
-    queryset = Community.objects.filter(is_active=True)
+    queryset = Community.objects.filter(is_active=True).select_related('created_by')
     serializer_class = CommunitySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'name'
     
     @action(detail=True, methods=['get'])
+    @cache_feed('community:{name}')
     def posts(self, request, name=None):
         """Get posts for a specific community"""
         community = self.get_object()
-        posts = community.posts.filter(is_deleted=False).order_by('-score', '-created_at')
+        posts = community.posts.filter(is_deleted=False).select_related('author', 'community').defer('content').order_by('-score', '-created_at')
         
         # Pagination
         page = self.paginate_queryset(posts)
         if page is not None:
-            serializer = PostSerializer(page, many=True)
+            serializer = PostListSerializer(page, many=True, context={'request': request})
             return self.get_paginated_response(serializer.data)
         
-        serializer = PostSerializer(posts, many=True)
+        serializer = PostListSerializer(posts, many=True, context={'request': request})
         return Response(serializer.data)
 
 
@@ -45,26 +57,65 @@ class PostViewSet(viewsets.ModelViewSet):
     queryset = Post.objects.filter(is_deleted=False)
     permission_classes = [IsAuthenticatedOrReadOnly]
     
+    def get_queryset(self):
+        """Join author and community for reads so serializing rows needs no extra queries"""
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve', 'comment', 'vote', 'update', 'partial_update', 'destroy'):
+            queryset = queryset.select_related('author', 'community')
+        if self.action == 'list':
+            # Feeds never show the post body, so leave it out of the SELECT
+            queryset = queryset.defer('content')
+        return queryset
+    
     def get_serializer_class(self):
         if self.action == 'create':
             return PostCreateSerializer
+        if self.action == 'list':
+            return PostListSerializer
         return PostSerializer
     
+    # Votes and comments leave the site-wide feed alone, so the counts it shows may lag by up to FEED_CACHE_TIMEOUT
+    @cache_feed('posts')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     def perform_create(self, serializer):
         """Create a new post and update community post count"""
         post = serializer.save()
-        post.community.post_count = F('post_count') + 1
-        post.community.save(update_fields=['post_count'])
+        Community.objects.filter(pk=post.community_id).update(post_count=F('post_count') + 1)
+        invalidate_feeds('posts', *post_feed_scopes(post))
+    
+    def perform_update(self, serializer):
+        """Save an edited post and retire the feeds that showed it before and after"""
+        scopes = post_feed_scopes(serializer.instance)
+        post = serializer.save()
+        invalidate_feeds('posts', *set(scopes + post_feed_scopes(post)))
+    
+    def perform_destroy(self, instance):
+        """Delete a post and retire the feeds that listed it"""
+        scopes = post_feed_scopes(instance)
+        instance.delete()
+        invalidate_feeds('posts', *scopes)
     
     @action(detail=True, methods=['get'])
     def comments(self, request, pk=None):
         """Get comments for a specific post"""
         post = self.get_object()
-        comments = post.comments.filter(
-            is_deleted=False, parent_comment=None
-        ).order_by('-score', '-created_at')
+        top_level = post.comments.filter(
+            is_deleted=False, parent_comment__isnull=True
+        ).select_related('author').order_by('-score', '-created_at')
+        
+        # Pagination
+        page = self.paginate_queryset(top_level)
+        comments = list(top_level) if page is None else page
+        
+        # Fetch the replies under these comments at once and assemble the reply tree in memory
+        replies = replies_below(comment.id for comment in comments).order_by('-score', '-created_at')
+        context = {'request': request, 'children_by_parent': group_replies(replies) if comments else {}}
         
-        serializer = CommentSerializer(comments, many=True)
+        serializer = CommentSerializer(comments, many=True, context=context)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
@@ -80,11 +131,12 @@ class PostViewSet(viewsets.ModelViewSet):
             comment = serializer.save()
             
             # Update post comment count
-            post.comment_count = F('comment_count') + 1
-            post.save(update_fields=['comment_count'])
+            Post.objects.filter(pk=post.pk).update(comment_count=F('comment_count') + 1)
+            invalidate_feeds(*post_feed_scopes(post), *comment_feed_scopes(comment))
             
+            # A brand new comment has no replies, so skip loading the reply tree
             return Response(
-                CommentSerializer(comment).data,
+                CommentSerializer(comment, context={'children_by_parent': {}}).data,
                 status=status.HTTP_201_CREATED
             )
         
@@ -94,63 +146,9 @@ class PostViewSet(viewsets.ModelViewSet):
     def vote(self, request, pk=None):
         """Vote on a post"""
         post = self.get_object()
-        return self._handle_vote(request, post)
-    
-    def _handle_vote(self, request, obj):
-        """Handle voting logic for posts and comments"""
-        from django.contrib.contenttypes.models import ContentType
-        
-        vote_type = request.data.get('vote_type')
-        if vote_type not in ['up', 'down']:
-            return Response(
-                {'error': 'vote_type must be "up" or "down"'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        content_type = ContentType.objects.get_for_model(obj)
-        
-        # Get or create vote
-        vote_obj, created = Vote.objects.get_or_create(
-            user=request.user,
-            content_type=content_type,
-            object_id=obj.id,
-            defaults={'vote_type': vote_type}
-        )
-        
-        if not created:
-            if vote_obj.vote_type == vote_type:
-                # Remove vote if clicking same button
-                vote_obj.delete()
-                vote_type = None
-            else:
-                # Change vote
-                vote_obj.vote_type = vote_type
-                vote_obj.save()
-        
-        # Update vote counts
-        self._update_vote_counts(obj)
-        
-        return Response({
-            'vote_type': vote_type,
-            'score': obj.score,
-            'upvotes': obj.upvotes,
-            'downvotes': obj.downvotes
-        })
-    
-    def _update_vote_counts(self, obj):
-        """Update vote counts for an object"""
-        from django.contrib.contenttypes.models import ContentType
-        
-        ct = ContentType.objects.get_for_model(obj)
-        votes = Vote.objects.filter(content_type=ct, object_id=obj.id)
-        
-        upvotes = votes.filter(vote_type='up').count()
-        downvotes = votes.filter(vote_type='down').count()
-        
-        obj.upvotes = upvotes
-        obj.downvotes = downvotes
-        obj.score = upvotes - downvotes
-        obj.save(update_fields=['upvotes', 'downvotes', 'score'])
+        response = handle_vote(request, post)
+        invalidate_feeds(*post_feed_scopes(post), viewer_scope(request.user))
+        return response
 
 
 class CommentViewSet(viewsets.ModelViewSet):
@@ -162,6 +160,12 @@ class CommentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter comments by post if post parameter is provided"""
         queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            queryset = with_reply_count(queryset.select_related('author'))
+        elif self.action == 'reply':
+            queryset = queryset.select_related('author', 'post__author', 'post__community')
+        elif self.action in ('vote', 'update', 'partial_update', 'destroy'):
+            queryset = queryset.select_related('author', 'parent_comment__author')
         post_id = self.request.query_params.get('post', None)
         if post_id:
             try:
@@ -172,11 +176,24 @@ class CommentViewSet(viewsets.ModelViewSet):
                 queryset = queryset.none()
         return queryset.order_by('-created_at')
     
+    def perform_update(self, serializer):
+        """Save an edited comment and retire the feeds that show it"""
+        comment = serializer.save()
+        invalidate_feeds(*comment_feed_scopes(comment))
+    
+    def perform_destroy(self, instance):
+        """Delete a comment and retire the feeds that listed it"""
+        scopes = comment_feed_scopes(instance)
+        instance.delete()
+        invalidate_feeds(*scopes)
+    
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def vote(self, request, pk=None):
         """Vote on a comment"""
         comment = self.get_object()
-        return PostViewSet()._handle_vote(request, comment)
+        response = handle_vote(request, comment)
+        invalidate_feeds(*comment_feed_scopes(comment), viewer_scope(request.user))
+        return response
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def reply(self, request, pk=None):
@@ -198,11 +215,12 @@ class CommentViewSet(viewsets.ModelViewSet):
             comment = serializer.save(parent_comment=parent_comment)
             
             # Update post comment count
-            parent_comment.post.comment_count = F('comment_count') + 1
-            parent_comment.post.save(update_fields=['comment_count'])
+            Post.objects.filter(pk=parent_comment.post_id).update(comment_count=F('comment_count') + 1)
+            invalidate_feeds(*post_feed_scopes(parent_comment.post), *comment_feed_scopes(comment))
             
+            # A brand new comment has no replies, so skip loading the reply tree
             return Response(
-                CommentSerializer(comment).data,
+                CommentSerializer(comment, context={'children_by_parent': {}}).data,
                 status=status.HTTP_201_CREATED
             )
         
@@ -258,31 +276,30 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         """Get comments that are replies to this user's comments"""
         user = self.get_object()
         
-        # Find all comments made by this user
-        user_comments = user.comments.filter(is_deleted=False).values_list('id', flat=True)
-        
-        # Find replies to those comments
-        replies_to_user = Comment.objects.filter(
-            parent_comment__in=user_comments,
+        # Replies to this user's live comments, found with a single join on the parent comment
+        replies_to_user = with_reply_count(Comment.objects.filter(
+            parent_comment__author=user,
+            parent_comment__is_deleted=False,
             is_deleted=False
-        ).exclude(
+        ).select_related('author')).exclude(
             author=user  # Exclude self-replies
         ).order_by('-created_at')
         
         # Limit to recent replies (last 50)
-        replies_to_user = replies_to_user[:50]
+        replies_to_user = list(replies_to_user[:50])
         
-        serializer = CommentSerializer(replies_to_user, many=True)
+        serializer = CommentSerializer(replies_to_user, many=True, context={'request': request})
         return Response({
             'replies': serializer.data,
-            'count': len(serializer.data)
+            'count': len(replies_to_user)
         })
     
     @action(detail=True, methods=['get'])
+    @cache_feed('user:{username}')
     def posts(self, request, username=None):
         """Get posts by a specific user"""
         user = self.get_object()
-        posts = user.posts.filter(is_deleted=False).order_by('-created_at')
+        posts = user.posts.filter(is_deleted=False).select_related('author', 'community').defer('content').order_by('-created_at')
         
         # Apply sorting and filtering similar to other endpoints
         sort_by = request.query_params.get('sort', 'new')
@@ -292,17 +309,18 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         # Pagination
         page = self.paginate_queryset(posts)
         if page is not None:
-            serializer = PostSerializer(page, many=True)
+            serializer = PostListSerializer(page, many=True, context={'request': request})
             return self.get_paginated_response(serializer.data)
         
-        serializer = PostSerializer(posts, many=True)
+        serializer = PostListSerializer(posts, many=True, context={'request': request})
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
+    @cache_feed('user:{username}')
     def comments(self, request, username=None):
         """Get comments by a specific user"""
         user = self.get_object()
-        comments = user.comments.filter(is_deleted=False).order_by('-created_at')
+        comments = with_reply_count(user.comments.filter(is_deleted=False).select_related('author')).order_by('-created_at')
         
         # Apply sorting similar to other endpoints
         sort_by = request.query_params.get('sort', 'new')
@@ -312,8 +330,96 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         # Pagination
         page = self.paginate_queryset(comments)
         if page is not None:
-            serializer = CommentSerializer(page, many=True)
+            serializer = CommentSerializer(page, many=True, context={'request': request})
             return self.get_paginated_response(serializer.data)
         
-        serializer = CommentSerializer(comments, many=True)
+        serializer = CommentSerializer(comments, many=True, context={'request': request})
         return Response(serializer.data)
+
+
+def _extract_field(data, field_path):
+    """Walk a dotted path like 'results.0.id' through nested dicts and lists"""
+    value = data
+    for key in filter(None, field_path.split('.')):
+        try:
+            value = value[int(key)] if isinstance(value, list) else value[key]
+        except (KeyError, IndexError, TypeError, ValueError):
+            return None
+    return value
+
+
+def _sub_request(request, method, path, query_string, body):
+    """WSGI request for one batch call, built on the caller's environ so host, scheme and headers carry over"""
+    environ = dict(request.META)
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+    })
+    return WSGIRequest(environ)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def batch(request):
+    """Run several API calls in one round trip, feeding earlier results into later calls"""
+    calls = request.data.get('calls')
+    if not isinstance(calls, list) or not calls:
+        return Response({'error': 'calls must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(calls) > BATCH_MAX_CALLS:
+        return Response({'error': f'At most {BATCH_MAX_CALLS} calls per batch'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    renderer = ORJSONRenderer()
+    results = {}
+    responses = []
+    
+    for index, call in enumerate(calls):
+        if not isinstance(call, dict):
+            responses.append({'id': index, 'status': 400, 'body': {'error': 'Each call must be an object'}})
+            continue
+        
+        call_id = call.get('id', index)
+        method = str(call.get('method', 'GET')).upper()
+        url, _, query_string = str(call.get('path', '')).partition('?')
+        
+        # Only proxy plain API calls, never another batch
+        if method not in ('GET', 'POST') or not url.startswith('/api/') or url.startswith('/api/batch/'):
+            responses.append({'id': call_id, 'status': 400, 'body': {'error': 'Unsupported call'}})
+            continue
+        
+        query = QueryDict(query_string, mutable=True)
+        
+        # Feed a value from an earlier call in as a query parameter or a {input} path placeholder
+        if 'input_from' in call:
+            value = _extract_field(results.get(call['input_from']), call.get('input_field', ''))
+            if value is None:
+                responses.append({'id': call_id, 'status': 424, 'body': {'error': 'Input not available'}})
+                continue
+            if call.get('param'):
+                query[call['param']] = value
+            else:
+                url = url.replace('{input}', str(value))
+        
+        try:
+            match = resolve(url)
+        except Resolver404:
+            responses.append({'id': call_id, 'status': 404, 'body': {'error': 'Not found'}})
+            continue
+        
+        body = renderer.render(call.get('body', {})) if method == 'POST' else b''
+        sub_request = _sub_request(request, method, url, query.urlencode(), body)
+        
+        # Reuse the caller's credentials instead of authenticating every sub-request again
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+        
+        response = match.func(sub_request, *match.args, **match.kwargs)
+        data = getattr(response, 'data', None)
+        if 200 <= response.status_code < 300:
+            results[call_id] = data
+        responses.append({'id': call_id, 'status': response.status_code, 'body': data})
+    
+    return Response({'responses': responses})
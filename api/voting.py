@@ -0,0 +1,37 @@
+"""
+Vote handling shared by the post and comment API endpoints
+"""
+
+from functools import lru_cache
+
+from django.contrib.contenttypes.models import ContentType
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.models import Vote
+
+
+@lru_cache(maxsize=None)
+def content_type_id(model):
+    """Return the ContentType id for a votable model, memoized per process"""
+    return ContentType.objects.get_for_model(model).id
+
+
+def handle_vote(request, obj):
+    """Handle voting logic for posts and comments"""
+    vote_type = request.data.get('vote_type')
+    if vote_type not in ['up', 'down']:
+        return Response(
+            {'error': 'vote_type must be "up" or "down"'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    vote_type = Vote.cast(request.user, obj, vote_type)
+    
+    return Response({
+        'vote_type': vote_type,
+        'score': obj.score,
+        'upvotes': obj.upvotes,
+        'downvotes': obj.downvotes
+    })
+
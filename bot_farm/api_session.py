@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+API Session - Shared HTTP connection pooling for talking to the Bottit API
+"""
+
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Every bot talks to the same API host, so size one pool for the whole farm
+POOL_CONNECTIONS = 4  # distinct hosts kept pooled
+POOL_MAXSIZE = 32  # keep-alive connections kept per host
+
+# (connect, read) seconds; a stalled backend fails the call instead of hanging the bot's thread
+REQUEST_TIMEOUT = (3.05, 10)
+
+# Retries connection failures, rate limiting and gateway errors with backoff (honouring Retry-After).
+# Status retries stay on the default idempotent methods: a POST that timed out may already have
+# created a post or toggled a vote.
+RETRY_STRATEGY = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 502, 503, 504))
+
+# One adapter shared by every session, so all bots draw from the same warm connections
+_shared_adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=RETRY_STRATEGY)
+
+
+class ApiSession(requests.Session):
+    """Session that applies REQUEST_TIMEOUT to any call that doesn't pass its own"""
+    
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+def create_session() -> requests.Session:
+    """Create a requests session backed by the farm-wide connection pool"""
+    session = ApiSession()
+    session.mount('http://', _shared_adapter)
+    session.mount('https://', _shared_adapter)
+    return session
+
+
+def encode_json(data) -> bytes:
+    """Encode a request body with orjson, which emits UTF-8 bytes directly"""
+    return orjson.dumps(data)
+
+
+def decode_json(response: requests.Response):
+    """Decode a JSON response body with orjson"""
+    return orjson.loads(response.content)
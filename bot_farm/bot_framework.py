@@ -7,14 +7,198 @@ import google.generativeai as genai
 import requests
 import random
 import time
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+from collections import OrderedDict, deque
 from dataclasses import dataclass
+from itertools import accumulate
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
 
 from .personalities import BotPersonality, BotPersonalityType
+from .api_session import create_session, encode_json, decode_json
 
+# Seconds between actions for a bot at activity level 1.0; scaled down for more active bots.
+# Much shorter cooldown for focused engagement (was 5 minutes)
+BASE_COOLDOWN = 20
 
-@dataclass
+# Most recent actions kept per bot; older entries drop off so long runs don't grow without bound
+ACTION_HISTORY_LIMIT = 1000
+
+# Seconds a fetched post stays fresh enough to use as generation context
+POST_CACHE_TTL = 15
+
+# Posts whose ETag is kept for revalidation after the TTL; the least recently used drop off first
+POST_ETAG_LIMIT = 500
+
+# Seconds a fetched list of replies to this bot is reused across decisions
+PENDING_REPLIES_TTL = 15
+
+# Sampling settings for post generation; high temperature for diversity
+POST_GENERATION_CONFIG = {
+    'temperature': 1.5,  # Very high temperature for maximum creativity
+    'top_p': 0.98,      # Allow maximum diverse token selection
+    'top_k': 40,       # Consider even more possible tokens
+    'max_output_tokens': 128_000,
+    'candidate_count': 1
+}
+
+# Sampling settings for comments and replies
+COMMENT_GENERATION_CONFIG = {
+    'temperature': 1.5,  # Much higher temperature for maximum diversity
+    'top_p': 0.95,      # Allow even more diverse token selection
+    'top_k': 40,        # Consider many more possible tokens
+    'max_output_tokens': 128_000,
+    'candidate_count': 1
+}
+
+# Openers for post prompts; formatted with the topic
+POST_INTRO_VARIATIONS = (
+    "Write a unique forum post about {topic}.",
+    "Create an original discussion about {topic}.",
+    "Share your thoughts on {topic} in a forum post.",
+    "Write a compelling post discussing {topic}.",
+    "Compose a forum entry about {topic}."
+)
+
+# Personality part of a post prompt, after the opener; filled in once per bot
+POST_PROMPT_TAIL = """
+
+Your personality: {personality}
+
+Be creative and express your unique perspective. Avoid generic responses.
+
+Style guidelines:
+{style}"""
+
+# Optional creative nudges appended to post prompts
+POST_CREATIVE_ADDITIONS = (
+    "- Include a personal anecdote or example",
+    "- Ask thought-provoking questions",
+    "- Share a contrarian viewpoint",
+    "- Reference current trends or events",
+    "- Use metaphors or analogies",
+    "- Include specific details or examples"
+)
+
+# Openers for prompts that comment directly on a post
+COMMENT_VARIATIONS = (
+    "Write an engaging comment on this forum post:",
+    "Share your unique perspective on this post:",
+    "Respond thoughtfully to this discussion:",
+    "Add your voice to this conversation:",
+    "Contribute meaningfully to this topic:"
+)
+
+# Openers for prompts that reply to a comment; formatted with the post title and comment author
+REPLY_VARIATIONS = (
+    "Write a thoughtful reply to this comment on '{post_title}':",
+    "Respond to {comment_author}'s comment with your unique perspective:",
+    "Reply to this comment in your own voice:",
+    "Share your thoughts in response to this comment:",
+    "Craft a meaningful reply to this comment:"
+)
+
+# Personality parts of reply and comment prompts, after the conversation context; filled in once per bot
+REPLY_PROMPT_TAIL = """
+Your personality: {personality}
+
+Be original and avoid generic responses. Express your unique viewpoint that builds on the conversation.
+
+Style:
+{style}"""
+COMMENT_PROMPT_TAIL = """
+Your personality: {personality}
+
+Be creative and avoid clichés. Share specific thoughts or experiences.
+
+Style:
+{style}"""
+
+# Optional creative nudges appended to comment prompts
+COMMENT_CREATIVE_ADDITIONS = (
+    "- Share a personal experience or example",
+    "- Ask a follow-up question",
+    "- Offer a different perspective",
+    "- Reference something specific from the post",
+    "- Use humor if appropriate",
+    "- Build on or challenge a point made"
+)
+
+# Decision state -> {action: (ActionProbabilities field, multiplier)}; scaled by each bot's
+# personality once at startup. Key order is the order actions are offered to the sampler.
+ACTION_WEIGHT_TABLE = {
+    # Someone replied to us on the current post
+    'current_reply': {'respond_to_current_reply': ('reply_to_comment', 2000)},
+    # No recent post to focus on - moderately favor creating new content
+    'no_post': {'create_post': ('create_post', 200)},
+    # Others are talking and we haven't made our base comment yet
+    'others_uncommented': {
+        'vote_post': ('vote_on_post', 200),
+        'comment_post': ('comment_on_post', 1500),
+        'vote_comment': ('vote_on_comment', 100),
+        'reply_comment': ('reply_to_comment', 200),
+        'create_post': ('create_post', 2),
+    },
+    # Others are talking and our base comment is in - interact with them instead
+    'others_commented': {
+        'vote_post': ('vote_on_post', 200),
+        'vote_comment': ('vote_on_comment', 600),
+        'reply_comment': ('reply_to_comment', 1200),
+        'create_post': ('create_post', 2),
+    },
+    # Nobody else has commented and neither have we
+    'uncommented': {
+        'vote_post': ('vote_on_post', 200),
+        'comment_post': ('comment_on_post', 1000),
+        'create_post': ('create_post', 2),
+    },
+    # Nobody else has commented and our base comment is in
+    'commented': {
+        'vote_post': ('vote_on_post', 200),
+        'create_post': ('create_post', 2),
+    },
+}
+
+# Communities that exist on the server; bots may prefer others
+EXISTING_COMMUNITIES = frozenset({'general', 'bots', 'testing'})
+
+# Preferred communities that don't exist -> the existing one to post in instead
+COMMUNITY_FALLBACKS = {
+    'help': 'general',
+    'tutorials': 'bots',
+    'philosophy': 'general',
+    'academic': 'general',
+    'technology': 'general',
+    'showoff': 'bots',
+    'debate': 'general',
+    'analysis': 'general',
+    'casual': 'general',
+    'fun': 'general'
+}
+
+# Canned content used when generation fails
+FALLBACK_COMMENTS = (
+    "Interesting point!",
+    "Thanks for sharing this.",
+    "I agree with this perspective.",
+    "This is worth considering."
+)
+FALLBACK_POST = ("Interesting Discussion", "What are your thoughts on this topic?")
+FALLBACK_POST_TITLES = (
+    "What's everyone working on today?",
+    "Interesting discussion topic",
+    "Thoughts on recent developments?",
+    "What's your take on this?"
+)
+FALLBACK_POST_CONTENTS = (
+    "I'm curious to hear what everyone thinks about this.",
+    "Always interested in different perspectives.",
+    "What's your experience with this?",
+    "Looking forward to the discussion!"
+)
+
+
+@dataclass(slots=True)
 class BotAction:
     """Represents an action a bot wants to take"""
     action_type: str  # 'create_post', 'comment', 'vote', 'reply'
@@ -23,6 +207,7 @@ class BotAction:
     vote_type: Optional[str] = None  # 'up' or 'down'
     community_name: Optional[str] = None
     title: Optional[str] = None  # for posts
+    top_level_target: bool = False  # for replies: target is known to have no parent, so no thread is needed
 
 
 class BotFramework:
@@ -33,8 +218,66 @@ class BotFramework:
         self.personality = personality
         self.api_key = api_key
         self.base_url = base_url
+        # Server-side path of the API root, as the batch endpoint expects in its calls
+        self.api_path = urlparse(base_url).path.rstrip('/')
         self.last_action_time = None
-        self.action_history = []
+        # time.monotonic() of the last action; the cooldown check uses this rather than the wall clock
+        self._last_action_at: Optional[float] = None
+        # Activity level is fixed per bot, so the cooldown and action chance are too
+        self._cooldown_seconds = BASE_COOLDOWN / personality.activity_level
+        self._action_chance = personality.activity_level * 1.2
+        self.action_history = deque(maxlen=ACTION_HISTORY_LIMIT)
+        # Lifetime count of actions; the history above only keeps the latest ones
+        self.action_count = 0
+        # Reuse keep-alive connections from the farm-wide pool for every API call this bot makes
+        self.session = create_session()
+        # Auth headers never change for a bot, so set them once on the session
+        self.session.headers.update(self.get_headers())
+        # post_id -> (fetched_at, post data); posts are fetched per viewer, so the cache is per bot
+        self._post_cache: Dict[int, tuple] = {}
+        # post_id -> (ETag, post data it describes); outlives the TTL so expired posts can be revalidated
+        self._post_etags: OrderedDict = OrderedDict()
+        # Posts this bot is known to have base-commented on; that never reverts, so no expiry
+        self._commented_posts = set()
+        # (fetched_at, replies) from the last pending-replies lookup
+        self._pending_replies_cache: Optional[tuple] = None
+        # Private generator per bot, so threads running different bots don't share one
+        self.rng = random.Random()
+        # One client per bot; the model handle is reused for every generation call
+        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        # action_type -> bound handler, so executing an action is a single lookup
+        self._action_handlers = {
+            'create_post': self._create_post,
+            'comment_post': self._comment_on_post,
+            'vote_post': self._vote_on_post,
+            'vote_comment': self._vote_on_comment,
+            'reply_comment': self._reply_to_comment,
+        }
+        # decision state -> {action: weight}; the personality never changes, so scale the table once
+        probabilities = personality.action_probabilities
+        self._action_weights = {
+            state: {
+                action: int(getattr(probabilities, field) * multiplier)
+                for action, (field, multiplier) in weights.items()
+            }
+            for state, weights in ACTION_WEIGHT_TABLE.items()
+        }
+        # (state, has current-post replies) -> (actions, cumulative weights), ready for rng.choices
+        reply_weights = self._action_weights['current_reply']
+        self._action_choices = {}
+        for state, weights in self._action_weights.items():
+            if state == 'current_reply':
+                continue
+            for has_replies in (False, True):
+                combined = {**reply_weights, **weights} if has_replies else weights
+                self._action_choices[state, has_replies] = (tuple(combined), list(accumulate(combined.values())))
+        # Everything in a prompt after the opener and context depends only on the personality
+        comment_style_lines = self._build_comment_style_lines()
+        self._post_prompt_tail = POST_PROMPT_TAIL.format(
+            personality=personality.description, style=self._build_post_style_lines()
+        )
+        self._reply_prompt_tail = REPLY_PROMPT_TAIL.format(personality=personality.description, style=comment_style_lines)
+        self._comment_prompt_tail = COMMENT_PROMPT_TAIL.format(personality=personality.description, style=comment_style_lines)
         
     def get_headers(self) -> Dict[str, str]:
         """Get API headers for requests"""
@@ -43,81 +286,138 @@ class BotFramework:
             'Content-Type': 'application/json'
         }
     
+    def close(self):
+        """Close the bot's HTTP session and the pooled connections behind it"""
+        self.session.close()
+    
     def has_base_comment_on_post(self, post_id: int) -> bool:
         """Check if this bot has already made a base-level comment on the given post"""
+        if post_id in self._commented_posts:
+            return True
+        
         try:
             url = f"{self.base_url}/users/{self.bot_id}/post_comments/"
             params = {'post_id': post_id}
-            response = requests.get(url, headers=self.get_headers(), params=params)
+            response = self.session.get(url, params=params)
             
             if response.status_code == 200:
-                data = response.json()
-                return data.get('has_commented', False)
+                data = decode_json(response)
+                if data.get('has_commented', False):
+                    self._commented_posts.add(post_id)
+                    return True
             return False
-        except Exception as e:
+        except (requests.RequestException, ValueError) as e:
             print(f"❌ Error checking base comment for {self.bot_id}: {e}")
             return False
     
-    def has_replied_to_comment(self, comment_id: int, all_comments: List[Dict]) -> bool:
-        """Check if this bot has already replied to a specific comment"""
-        for comment in all_comments:
-            comment_author = comment.get('author', {}).get('username')
-            parent_comment_id = comment.get('parent_comment')
-            
-            # Check if this is our comment replying to the target comment
-            if (comment_author == self.bot_id
-                    and parent_comment_id == comment_id):
-                return True
-        return False
+    def replied_comment_ids(self, all_comments: List[Dict]) -> set:
+        """Ids of the comments this bot has already replied to"""
+        return {
+            comment.get('parent_comment')
+            for comment in all_comments
+            if comment.get('author', {}).get('username') == self.bot_id
+        }
     
     def get_pending_replies(self) -> List[Dict]:
         """Get comments that are replies to this bot's comments"""
+        now = time.monotonic()
+        cached = self._pending_replies_cache
+        if cached and now - cached[0] < PENDING_REPLIES_TTL:
+            return cached[1]
+        
         try:
             url = f"{self.base_url}/users/{self.bot_id}/pending_replies/"
-            response = requests.get(url, headers=self.get_headers())
+            response = self.session.get(url)
             
             if response.status_code == 200:
-                data = response.json()
-                return data.get('replies', [])
+                replies = decode_json(response).get('replies', [])
+                self._pending_replies_cache = (now, replies)
+                return replies
             return []
-        except Exception as e:
+        except (requests.RequestException, ValueError) as e:
             print(f"❌ Error getting pending replies for {self.bot_id}: {e}")
             return []
-
+    
+    def fetch_bot_state(self, post_id: int) -> Tuple[List[Dict], bool]:
+        """Get pending replies and whether we base-commented on a post, in one round trip when both are needed"""
+        cached = self._pending_replies_cache
+        if post_id in self._commented_posts or (cached and time.monotonic() - cached[0] < PENDING_REPLIES_TTL):
+            # At least one answer is cached, so the single lookups cost one request at most
+            return self.get_pending_replies(), self.has_base_comment_on_post(post_id)
+        
+        calls = [
+            {'id': 'replies', 'path': f"{self.api_path}/users/{self.bot_id}/pending_replies/"},
+            {'id': 'commented', 'path': f"{self.api_path}/users/{self.bot_id}/post_comments/?post_id={post_id}"},
+        ]
+        try:
+            now = time.monotonic()
+            response = self.session.post(f"{self.base_url}/batch/", data=encode_json({'calls': calls}))
+            if response.status_code == 200:
+                bodies = {
+                    result['id']: result['body']
+                    for result in decode_json(response).get('responses', [])
+                    if result.get('status') == 200
+                }
+                if 'replies' in bodies and 'commented' in bodies:
+                    replies = bodies['replies'].get('replies', [])
+                    self._pending_replies_cache = (now, replies)
+                    already_commented = bodies['commented'].get('has_commented', False)
+                    if already_commented:
+                        self._commented_posts.add(post_id)
+                    return replies, already_commented
+        except (requests.RequestException, ValueError) as e:
+            print(f"❌ Error fetching bot state for {self.bot_id}: {e}")
+        
+        # Batch unavailable; fall back to the individual endpoints
+        return self.get_pending_replies(), self.has_base_comment_on_post(post_id)
+    
     def should_take_action(self) -> bool:
         """Determine if bot should take any action based on activity level and timing"""
-        if self.last_action_time is None:
+        if self._last_action_at is None:
             return True
-            
-        # Calculate time since last action
-        time_since_last = datetime.now() - self.last_action_time
         
-        # Much shorter cooldown for focused engagement (was 5 minutes)
-        base_cooldown = 20  # 20 seconds base cooldown
-        cooldown = base_cooldown / self.personality.activity_level
-        
-        if time_since_last.total_seconds() < cooldown:
+        if time.monotonic() - self._last_action_at < self._cooldown_seconds:
             return False
             
         # Higher probability of action for more active conversations
-        return random.random() < (self.personality.activity_level * 1.2)
+        return self.rng.random() < self._action_chance
     
     def decide_action(self, available_posts: List[Dict], available_comments: List[Dict]) -> Optional[BotAction]:
         """Decide what action to take - STRICTLY focused on latest post with leveled engagement rules"""
         if not self.should_take_action():
             return None
             
-        probabilities = self.personality.action_probabilities
-        actions = []
+        # Collected once so each candidate below is a set lookup instead of a scan of every comment
+        replied_ids = self.replied_comment_ids(available_comments)
+        # Everyone else's comments on the current post; shared by the weighting and target picking below
+        current_post_id = available_posts[0]['id'] if available_posts else None
+        other_comments = [
+            comment for comment in available_comments
+            if comment.get('author', {}).get('username') != self.bot_id
+            and comment.get('post') == current_post_id
+        ]
         
-        # ABSOLUTE PRIORITY: Check for replies to our comments that need responding to
-        pending_replies = self.get_pending_replies()
+        # ABSOLUTE PRIORITY: Check for replies to our comments that need responding to.
+        # The base-comment check on the latest post comes back in the same round trip.
+        # Without a post the only possible action is creating one, so nothing needs fetching.
+        already_commented = False
+        pending_replies = []
+        if available_posts:
+            latest_post_id = available_posts[0]['id']
+            if self._has_commented_on_post(latest_post_id, available_comments):
+                # Our base comment is among the loaded comments, so the server has nothing to add.
+                # The loaded list is only the newest page, so a miss still asks the server.
+                self._commented_posts.add(latest_post_id)
+            
+            if self._action_weights['current_reply']['respond_to_current_reply']:
+                pending_replies, already_commented = self.fetch_bot_state(latest_post_id)
+            else:
+                # This bot never answers replies, so only the base-comment check matters
+                already_commented = self.has_base_comment_on_post(latest_post_id)
         current_post_replies = []  # Replies on the current post ONLY
         
         # If we have a current post, ONLY process replies on that specific post
         if available_posts:
-            current_post_id = available_posts[0]['id']
-            
             # Find replies to our comments EXCLUSIVELY on the current post
             for reply in pending_replies:
                 reply_post_id = reply.get('post')
@@ -131,83 +431,53 @@ class BotFramework:
         # HIGHEST PRIORITY: Respond to replies on the current post
         if current_post_replies:
             # MASSIVELY prioritize responding to current post replies
-            actions.extend(['respond_to_current_reply'] * int(probabilities.reply_to_comment * 2000))  # 20x more likely
             print(f"🔥🔥 {self.bot_id} found {len(current_post_replies)} replies on current post - MAXIMUM PRIORITY!")
         
-        # STRICT FOCUS: Work EXCLUSIVELY on the most recent post if available
-        if available_posts:
-            latest_post = available_posts[0]  # ONLY work on the most recent post
-            post_id = latest_post['id']
-            
-            # CRITICAL CHECK: Has this bot already made a base-level comment on this specific post?
-            already_commented = self.has_base_comment_on_post(post_id)
-            
-            # ALWAYS boost voting on the current active post
-            actions.extend(['vote_post'] * int(probabilities.vote_on_post * 200))  # 2x more likely
-            
-            # Process comments with STRICT rules
+        # STRICT FOCUS: Work EXCLUSIVELY on the most recent post if available.
+        # Voting on it is always boosted and post creation is made EXTREMELY rare.
+        if not available_posts:
+            state = 'no_post'
+        elif other_comments:
+            # ABSOLUTE RULE: If we haven't made a base comment yet, HEAVILY prioritize it
+            if not already_commented:
+                state = 'others_uncommented'
+                print(f"🎯 {self.bot_id} MASSIVELY prioritizing base comment (first time on post {current_post_id})")
+            else:
+                state = 'others_commented'
+                print(f"🚫 {self.bot_id} BLOCKED from base comment - already commented on post {current_post_id}, FOCUSING on replies")
+        elif not already_commented:
+            state = 'uncommented'
             if available_comments:
-                # Filter out ONLY our own comments - all other comments are valid targets
-                other_comments = []
-                for comment in available_comments:
-                    comment_author = comment.get('author', {}).get('username')
-                    # Skip ONLY our own comments
-                    if comment_author == self.bot_id:
-                        continue
-                    other_comments.append(comment)
-                
-                if other_comments:
-                    # ABSOLUTE RULE: If we haven't made a base comment yet, HEAVILY prioritize it
-                    if not already_commented:
-                        # First comment on post gets MASSIVE priority
-                        actions.extend(['comment_post'] * int(probabilities.comment_on_post * 1500))  # 15x priority
-                        # Still allow some interactions, but much lower priority
-                        actions.extend(['vote_comment'] * int(probabilities.vote_on_comment * 100))
-                        actions.extend(['reply_comment'] * int(probabilities.reply_to_comment * 200))
-                        print(f"🎯 {self.bot_id} MASSIVELY prioritizing base comment (first time on post {post_id})")
-                    else:
-                        # ALREADY COMMENTED: Focus ENTIRELY on interacting with others
-                        actions.extend(['vote_comment'] * int(probabilities.vote_on_comment * 600))  # 6x more likely
-                        actions.extend(['reply_comment'] * int(probabilities.reply_to_comment * 1200))  # 12x more likely
-                        print(f"🚫 {self.bot_id} BLOCKED from base comment - already commented on post {post_id}, FOCUSING on replies")
-                else:
-                    # No other comments exist - make base comment if we haven't
-                    if not already_commented:
-                        actions.extend(['comment_post'] * int(probabilities.comment_on_post * 1000))  # MAXIMUM priority
-                        print(f"🎯 {self.bot_id} will make FIRST base comment (no other comments exist)")
-                    else:
-                        print(f"🚫 {self.bot_id} BLOCKED - already commented on post {post_id} with no other comments to interact with")
+                print(f"🎯 {self.bot_id} will make FIRST base comment (no other comments exist)")
             else:
-                # No comments at all - make base comment if we haven't
-                if not already_commented:
-                    actions.extend(['comment_post'] * int(probabilities.comment_on_post * 1000))  # MAXIMUM priority
-                    print(f"🎯 {self.bot_id} will make FIRST comment on post (no comments yet)")
-                else:
-                    print(f"🚫 {self.bot_id} BLOCKED - already commented on post {post_id}")
-            
-            # Make post creation EXTREMELY rare when there's an active post
-            actions.extend(['create_post'] * int(probabilities.create_post * 2))  # Only 0.2% of normal probability
+                print(f"🎯 {self.bot_id} will make FIRST comment on post (no comments yet)")
         else:
-            # No recent post available - moderately favor creating new content
-            actions.extend(['create_post'] * int(probabilities.create_post * 200))  # 2x more likely
+            state = 'commented'
+            if available_comments:
+                print(f"🚫 {self.bot_id} BLOCKED - already commented on post {current_post_id} with no other comments to interact with")
+            else:
+                print(f"🚫 {self.bot_id} BLOCKED - already commented on post {current_post_id}")
         
-        if not actions:
+        # Weights are precomputed per state, so sampling is a bisect over the cumulative totals
+        actions, cum_weights = self._action_choices[state, bool(current_post_replies)]
+        total_weight = cum_weights[-1]
+        if not total_weight:
             print(f"⚠️ {self.bot_id} has no available actions!")
             return None
             
-        chosen_action = random.choice(actions)
-        print(f"🎯 {self.bot_id} chose action: {chosen_action} from {len(actions)} weighted options")
+        chosen_action = self.rng.choices(actions, cum_weights=cum_weights)[0]
+        print(f"🎯 {self.bot_id} chose action: {chosen_action} from {total_weight} weighted options")
         
         # Handle the special case of responding to current post replies - TOP PRIORITY
         if chosen_action == 'respond_to_current_reply' and current_post_replies:
             # Filter out replies we've already responded to
             available_replies = []
             for reply in current_post_replies:
-                if not self.has_replied_to_comment(reply['id'], available_comments):
+                if reply['id'] not in replied_ids:
                     available_replies.append(reply)
             
             if available_replies:
-                reply_target = random.choice(available_replies)
+                reply_target = self.rng.choice(available_replies)
                 reply_author = reply_target.get('author', {}).get('username', 'unknown')
                 print(f"🔥🔥 {self.bot_id} PRIORITIZING current post reply from {reply_author}")
                 return BotAction(
@@ -235,27 +505,8 @@ class BotFramework:
                 target_id=post['id']
             )
         elif chosen_action == 'vote_comment' and available_comments:
-            # Filter out our own comments and ensure only current post comments
-            current_post_id = available_posts[0]['id'] if available_posts else None
-            other_comments = []
-            
-            for comment in available_comments:
-                comment_author = comment.get('author', {}).get('username')
-                comment_post_id = comment.get('post')
-                
-                # Skip our own comments
-                if comment_author == self.bot_id:
-                    continue
-                
-                # Skip comments from wrong posts (safety check)
-                if comment_post_id != current_post_id:
-                    continue
-                
-                other_comments.append(comment)
-            
             if other_comments:
-                comment = random.choice(other_comments)
-                current_post_id = available_posts[0]['id'] if available_posts else None
+                comment = self.rng.choice(other_comments)
                 print(f"🎯 {self.bot_id} voting on comment {comment.get('id')} on current post {current_post_id}")
                 return BotAction(
                     action_type='vote_comment',
@@ -263,41 +514,20 @@ class BotFramework:
                     vote_type=self._decide_vote_type()
                 )
             else:
-                current_post_id = available_posts[0]['id'] if available_posts else None
                 print(f"⚠️ {self.bot_id} no valid comments to vote on in current post {current_post_id}")
         elif chosen_action == 'reply_comment' and available_comments:
-            # Filter out our own comments, but allow replies to any other comment
-            other_comments = []
-            current_post_id = available_posts[0]['id'] if available_posts else None
-            
-            for comment in available_comments:
-                comment_author = comment.get('author', {}).get('username')
-                comment_post_id = comment.get('post')
-                
-                # Skip our own comments
-                if comment_author == self.bot_id:
-                    continue
-                
-                # Skip comments from wrong posts (safety check)
-                if comment_post_id != current_post_id:
-                    continue
-                
-                # Skip comments we've already replied to
-                if self.has_replied_to_comment(comment['id'], available_comments):
-                    continue
-                
-                other_comments.append(comment)
+            # Skip comments we've already replied to
+            reply_targets = [comment for comment in other_comments if comment['id'] not in replied_ids]
             
-            if other_comments:
-                comment = random.choice(other_comments)
-                current_post_id = available_posts[0]['id'] if available_posts else None
+            if reply_targets:
+                comment = self.rng.choice(reply_targets)
                 print(f"🎯 {self.bot_id} replying to comment {comment.get('id')} on current post {current_post_id}")
                 return BotAction(
                     action_type='reply_comment',
-                    target_id=comment['id']
+                    target_id=comment['id'],
+                    top_level_target='parent_comment' in comment and comment['parent_comment'] is None
                 )
             else:
-                current_post_id = available_posts[0]['id'] if available_posts else None
                 print(f"⚠️ {self.bot_id} no valid comments to reply to on current post {current_post_id}")
         
         return None
@@ -317,7 +547,7 @@ class BotFramework:
     def _choose_community(self) -> str:
         """Choose a community based on preferences"""
         if self.personality.preferred_communities:
-            return random.choice(self.personality.preferred_communities)
+            return self.rng.choice(self.personality.preferred_communities)
         return "general"
     
     def _has_commented_on_post(self, post_id: int, available_comments: List[Dict]) -> bool:
@@ -338,17 +568,17 @@ class BotFramework:
         
         total_chance = upvote_chance + downvote_chance
         if total_chance == 0:
-            return random.choice(['up', 'down'])
+            return self.rng.choice(('up', 'down'))
         
         upvote_probability = upvote_chance / total_chance
-        return 'up' if random.random() < upvote_probability else 'down'
+        return 'up' if self.rng.random() < upvote_probability else 'down'
     
     def generate_content(self, action: BotAction, context: Dict = None) -> str:
         """Generate content based on personality and action type"""
         try:
             if action.action_type == 'create_post':
                 return self._generate_post_content()
-            elif action.action_type in ['comment_post', 'reply_comment']:
+            elif action.action_type in ('comment_post', 'reply_comment'):
                 return self._generate_comment_content(context)
             return ""
         except Exception as e:
@@ -359,22 +589,12 @@ class BotFramework:
         """Generate post title and content with high temperature for diversity"""
         try:
             # Choose topic based on interests
-            topic = random.choice(self.personality.topic_interests)
+            topic = self.rng.choice(self.personality.topic_interests)
             
             # Build prompt based on personality
             prompt = self._build_post_prompt(topic)
             
-            # Configure generation with higher temperature for more creativity
-            generation_config = {
-                'temperature': 1.5,  # Very high temperature for maximum creativity
-                'top_p': 0.98,      # Allow maximum diverse token selection
-                'top_k': 40,       # Consider even more possible tokens
-                'max_output_tokens': 128_000,
-                'candidate_count': 1
-            }
-            
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            response = model.generate_content(prompt, generation_config=generation_config)
+            response = self.model.generate_content(prompt, generation_config=POST_GENERATION_CONFIG)
             
             # Parse response
             lines = response.text.strip().split('\n')
@@ -395,73 +615,63 @@ class BotFramework:
         try:
             prompt = self._build_comment_prompt(context)
             
-            # Configure generation with higher temperature for more creativity
-            generation_config = {
-                'temperature': 1.5,  # Much higher temperature for maximum diversity
-                'top_p': 0.95,      # Allow even more diverse token selection
-                'top_k': 40,        # Consider many more possible tokens
-                'max_output_tokens': 128_000,
-                'candidate_count': 1
-            }
-            
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            response = model.generate_content(prompt, generation_config=generation_config)
+            response = self.model.generate_content(prompt, generation_config=COMMENT_GENERATION_CONFIG)
             content = response.text.strip()
             return self._apply_personality_styling(content)
         except Exception as e:
             print(f"❌ Error generating comment: {e}")
             return self._get_fallback_content('comment')
     
-    def _build_post_prompt(self, topic: str) -> str:
-        """Build a prompt for post generation based on personality with variation"""
+    def _build_post_style_lines(self) -> str:
+        """Build the style guideline lines for post prompts from the personality's writing style"""
         style = self.personality.writing_style
-        personality_desc = self.personality.description
-        
-        # Add randomness to prompt structure
-        intro_variations = [
-            f"Write a unique forum post about {topic}.",
-            f"Create an original discussion about {topic}.", 
-            f"Share your thoughts on {topic} in a forum post.",
-            f"Write a compelling post discussing {topic}.",
-            f"Compose a forum entry about {topic}."
-        ]
-        
-        prompt = f"""{random.choice(intro_variations)}
-
-Your personality: {personality_desc}
-
-Be creative and express your unique perspective. Avoid generic responses.
-
-Style guidelines:
-"""
+        lines = ""
         
         if style.get('average_length') == 'short':
-            prompt += "- Keep it brief and to the point (under 200 words)\n"
+            lines += "- Keep it brief and to the point (under 200 words)\n"
         elif style.get('average_length') == 'long':
-            prompt += "- Write a detailed, thoughtful post (300-500 words)\n"
+            lines += "- Write a detailed, thoughtful post (300-500 words)\n"
         else:
-            prompt += "- Medium length post (200-300 words)\n"
+            lines += "- Medium length post (200-300 words)\n"
             
         if style.get('formal_tone'):
-            prompt += "- Use formal, academic language\n"
+            lines += "- Use formal, academic language\n"
         elif style.get('informal'):
-            prompt += "- Use casual, informal language\n"
+            lines += "- Use casual, informal language\n"
             
         if style.get('exclamation_marks'):
-            prompt += "- Show enthusiasm with exclamation marks\n"
+            lines += "- Show enthusiasm with exclamation marks\n"
         
-        # Add personality-specific creative prompts
-        creative_additions = [
-            "- Include a personal anecdote or example",
-            "- Ask thought-provoking questions",
-            "- Share a contrarian viewpoint", 
-            "- Reference current trends or events",
-            "- Use metaphors or analogies",
-            "- Include specific details or examples"
-        ]
+        return lines
+    
+    def _build_comment_style_lines(self) -> str:
+        """Build the style guideline lines for comment prompts from the personality's writing style"""
+        style = self.personality.writing_style
+        lines = ""
+        
+        if style.get('average_length') == 'short':
+            lines += "- Keep comment brief (under 100 words)\n"
+        elif style.get('average_length') == 'long':
+            lines += "- Write a thoughtful, detailed comment (150-250 words)\n"
+        else:
+            lines += "- Medium length comment (100-150 words)\n"
+            
+        if style.get('helpful_phrases'):
+            lines += "- Try to be helpful and constructive\n"
+            
+        if style.get('question_words'):
+            lines += "- Ask thoughtful questions or raise important points\n"
+        
+        return lines
+    
+    def _build_post_prompt(self, topic: str) -> str:
+        """Build a prompt for post generation based on personality with variation"""
+        # Add randomness to prompt structure
+        prompt = self.rng.choice(POST_INTRO_VARIATIONS).format(topic=topic) + self._post_prompt_tail
         
-        if random.random() < 0.7:  # 70% chance to add creative element
-            prompt += f"- {random.choice(creative_additions)}\n"
+        # Add personality-specific creative prompts
+        if self.rng.random() < 0.7:  # 70% chance to add creative element
+            prompt += f"- {self.rng.choice(POST_CREATIVE_ADDITIONS)}\n"
             
         prompt += "\nProvide a title on the first line, then the content. Be original and avoid clichés."
         
@@ -476,94 +686,37 @@ Style guidelines:
             comment_author = context.get('author', {}).get('username', 'Unknown')
             post_title = context.get('post', {}).get('title', 'Unknown Post')
             
-            personality_desc = self.personality.description
-            style = self.personality.writing_style
-            
-            reply_variations = [
-                f"Write a thoughtful reply to this comment on '{post_title}':",
-                f"Respond to {comment_author}'s comment with your unique perspective:",
-                "Reply to this comment in your own voice:",
-                "Share your thoughts in response to this comment:",
-                "Craft a meaningful reply to this comment:"
-            ]
-            
-            prompt = f"""{random.choice(reply_variations)}
-
-Original Post: {post_title}
-"""
+            intro = self.rng.choice(REPLY_VARIATIONS).format(post_title=post_title, comment_author=comment_author)
+            parts = [f"{intro}\n\nOriginal Post: {post_title}\n"]
             
             # Add conversation chain if available
             if 'conversation_chain' in context:
                 chain = context['conversation_chain']
-                prompt += "\nConversation so far:\n"
+                parts.append("\nConversation so far:\n")
                 for i, comment in enumerate(chain):
                     author = comment.get('author', {}).get('username', 'Unknown')
                     content = comment.get('content', '')[:200]  # Limit each comment length
-                    prompt += f"{i+1}. {author}: {content}\n"
-                prompt += f"\nYou are replying to comment {len(chain)} by {comment_author}.\n"
+                    parts.append(f"{i+1}. {author}: {content}\n")
+                parts.append(f"\nYou are replying to comment {len(chain)} by {comment_author}.\n")
             else:
-                prompt += f"\nComment by {comment_author}: {comment_content}...\n"
-
-            prompt += f"""
-Your personality: {personality_desc}
-
-Be original and avoid generic responses. Express your unique viewpoint that builds on the conversation.
-
-Style:
-"""
+                parts.append(f"\nComment by {comment_author}: {comment_content}...\n")
+            
+            parts.append(self._reply_prompt_tail)
+            prompt = "".join(parts)
         else:
             # This is a comment on a post
             post_title = context.get('title', 'Unknown Post')
             post_content = context.get('content', '')[:300]  # Truncate for prompt
             
-            personality_desc = self.personality.description
-            style = self.personality.writing_style
-            
-            comment_variations = [
-                "Write an engaging comment on this forum post:",
-                "Share your unique perspective on this post:",
-                "Respond thoughtfully to this discussion:",
-                "Add your voice to this conversation:",
-                "Contribute meaningfully to this topic:"
-            ]
-            
-            prompt = f"""{random.choice(comment_variations)}
+            prompt = f"""{self.rng.choice(COMMENT_VARIATIONS)}
 
 Title: {post_title}
 Content: {post_content}...
-
-Your personality: {personality_desc}
-
-Be creative and avoid clichés. Share specific thoughts or experiences.
-
-Style:
-"""
-        
-        if style.get('average_length') == 'short':
-            prompt += "- Keep comment brief (under 100 words)\n"
-        elif style.get('average_length') == 'long':
-            prompt += "- Write a thoughtful, detailed comment (150-250 words)\n"
-        else:
-            prompt += "- Medium length comment (100-150 words)\n"
-            
-        if style.get('helpful_phrases'):
-            prompt += "- Try to be helpful and constructive\n"
-            
-        if style.get('question_words'):
-            prompt += "- Ask thoughtful questions or raise important points\n"
+""" + self._comment_prompt_tail
         
         # Add creative elements randomly
-        creative_comment_additions = [
-            "- Share a personal experience or example",
-            "- Ask a follow-up question",
-            "- Offer a different perspective", 
-            "- Reference something specific from the post",
-            "- Use humor if appropriate",
-            "- Build on or challenge a point made"
-        ]
-        
-        if random.random() < 0.6:  # 60% chance to add creative element
-            prompt += f"- {random.choice(creative_comment_additions)}\n"
+        if self.rng.random() < 0.6:  # 60% chance to add creative element
+            prompt += f"- {self.rng.choice(COMMENT_CREATIVE_ADDITIONS)}\n"
             
         prompt += "\nAvoid generic phrases like 'interesting point' or 'thanks for sharing'."
             
@@ -572,36 +725,37 @@ Style:
     def _apply_personality_styling(self, text: str) -> str:
         """Apply personality-specific styling to generated text"""
         style = self.personality.writing_style
+        personality_type = self.personality.personality_type.value
         
         # Add personality-specific words/phrases
-        if style.get('positive_words') and self.personality.personality_type.value == 'enthusiast':
+        if style.get('positive_words') and personality_type == 'enthusiast':
             # Occasionally replace neutral words with positive ones
             positive_words = style['positive_words']
-            if random.random() < 0.3:  # 30% chance
-                text = text.replace('good', random.choice(positive_words))
+            if self.rng.random() < 0.3:  # 30% chance
+                text = text.replace('good', self.rng.choice(positive_words))
         
-        if style.get('slang') and self.personality.personality_type.value == 'casual':
+        if style.get('slang') and personality_type == 'casual':
             # Occasionally add slang
             slang_words = style['slang']
-            if random.random() < 0.4:  # 40% chance
-                text += f" {random.choice(slang_words)}"
+            if self.rng.random() < 0.4:  # 40% chance
+                text += f" {self.rng.choice(slang_words)}"
         
         # Enhanced INCEL personality styling for more variety
-        if self.personality.personality_type.value == 'incel':
+        if personality_type == 'incel':
             # Add complaints and negative phrases randomly
-            if style.get('complaints') and random.random() < 0.5:  # 50% chance
-                complaint = random.choice(style['complaints'])
+            if style.get('complaints') and self.rng.random() < 0.5:  # 50% chance
+                complaint = self.rng.choice(style['complaints'])
                 text += f" {complaint}"
             
             # Add negative phrases occasionally  
-            if style.get('negative_phrases') and random.random() < 0.3:  # 30% chance
-                neg_phrase = random.choice(style['negative_phrases'])
+            if style.get('negative_phrases') and self.rng.random() < 0.3:  # 30% chance
+                neg_phrase = self.rng.choice(style['negative_phrases'])
                 text = f"{neg_phrase}, {text.lower()}"
             
             # Add internet slang sometimes
-            if style.get('internet_slang') and random.random() < 0.4:  # 40% chance
-                slang = random.choice(style['internet_slang'])
-                if random.random() < 0.5:
+            if style.get('internet_slang') and self.rng.random() < 0.4:  # 40% chance
+                slang = self.rng.choice(style['internet_slang'])
+                if self.rng.random() < 0.5:
                     text = f"{slang} {text}"
                 else:
                     text += f" {slang}"
@@ -610,62 +764,33 @@ Style:
     
     def _get_fallback_content(self, action_type: str) -> str:
         """Get fallback content when generation fails"""
-        fallbacks = {
-            'comment': [
-                "Interesting point!",
-                "Thanks for sharing this.",
-                "I agree with this perspective.",
-                "This is worth considering."
-            ],
-            'post': ("Interesting Discussion", "What are your thoughts on this topic?")
-        }
-        
         if action_type == 'create_post':
-            return fallbacks['post']
+            return FALLBACK_POST
         else:
-            return random.choice(fallbacks['comment'])
+            return self.rng.choice(FALLBACK_COMMENTS)
     
     def _get_fallback_post(self) -> tuple:
         """Get fallback post content"""
-        titles = [
-            "What's everyone working on today?",
-            "Interesting discussion topic",
-            "Thoughts on recent developments?",
-            "What's your take on this?"
-        ]
-        
-        contents = [
-            "I'm curious to hear what everyone thinks about this.",
-            "Always interested in different perspectives.",
-            "What's your experience with this?",
-            "Looking forward to the discussion!"
-        ]
-        
-        return random.choice(titles), random.choice(contents)
+        return self.rng.choice(FALLBACK_POST_TITLES), self.rng.choice(FALLBACK_POST_CONTENTS)
     
     def execute_action(self, action: BotAction) -> bool:
         """Execute the decided action"""
         try:
-            if action.action_type == 'create_post':
-                return self._create_post(action)
-            elif action.action_type == 'comment_post':
-                return self._comment_on_post(action)
-            elif action.action_type == 'vote_post':
-                return self._vote_on_post(action)
-            elif action.action_type == 'vote_comment':
-                return self._vote_on_comment(action)
-            elif action.action_type == 'reply_comment':
-                return self._reply_to_comment(action)
-            
-            return False
+            handler = self._action_handlers.get(action.action_type)
+            if handler is None:
+                return False
+            return handler(action)
         except Exception as e:
             print(f"❌ Error executing action for {self.bot_id}: {e}")
             return False
         finally:
+            self._last_action_at = time.monotonic()
+            # One wall-clock read stamps both the status report and the history entry
             self.last_action_time = datetime.now()
+            self.action_count += 1
             self.action_history.append({
                 'action': action.action_type,
-                'timestamp': datetime.now(),
+                'timestamp': self.last_action_time,
                 'success': True  # We'll update this based on actual result
             })
     
@@ -675,21 +800,9 @@ Style:
         
         # Fall back to existing communities if preferred doesn't exist
         community_name = action.community_name or 'general'
-        if community_name not in ['general', 'bots', 'testing']:
+        if community_name not in EXISTING_COMMUNITIES:
             # Map non-existent communities to existing ones
-            community_mapping = {
-                'help': 'general',
-                'tutorials': 'bots', 
-                'philosophy': 'general',
-                'academic': 'general',
-                'technology': 'general',
-                'showoff': 'bots',
-                'debate': 'general',
-                'analysis': 'general',
-                'casual': 'general',
-                'fun': 'general'
-            }
-            community_name = community_mapping.get(community_name, 'general')
+            community_name = COMMUNITY_FALLBACKS.get(community_name, 'general')
         
         url = f"{self.base_url}/posts/"
         data = {
@@ -698,7 +811,7 @@ Style:
             'community_name': community_name
         }
         
-        response = requests.post(url, headers=self.get_headers(), json=data)
+        response = self.session.post(url, data=encode_json(data))
         
         if response.status_code == 201:
             print(f"✅ {self.bot_id} created post: {title}")
@@ -707,24 +820,59 @@ Style:
             print(f"❌ {self.bot_id} failed to create post: {response.text}")
             return False
     
+    def _get_post(self, post_id: int) -> Optional[Dict]:
+        """Get post details, reusing a recent fetch of the same post"""
+        now = time.monotonic()
+        cached = self._post_cache.get(post_id)
+        if cached and now - cached[0] < POST_CACHE_TTL:
+            return cached[1]
+        
+        # Past the TTL, revalidate instead of re-downloading; an unchanged post comes back as an empty 304
+        validator = self._post_etags.get(post_id)
+        headers = {'If-None-Match': validator[0]} if validator else None
+        post_response = self.session.get(f"{self.base_url}/posts/{post_id}/", headers=headers)
+        if post_response.status_code == 304 and validator:
+            post_data = validator[1]
+        elif post_response.status_code == 200:
+            post_data = decode_json(post_response)
+        else:
+            return None
+        
+        self._cache_post(post_id, post_data, now, post_response.headers.get('ETag'))
+        return post_data
+    
+    def _cache_post(self, post_id: int, post_data: Dict, fetched_at: float, etag: Optional[str] = None):
+        """Remember a fetched post for POST_CACHE_TTL seconds, and its ETag for revalidating after that"""
+        # Drop stale entries so the cache only ever holds recently touched posts
+        self._post_cache = {
+            pid: entry for pid, entry in self._post_cache.items()
+            if fetched_at - entry[0] < POST_CACHE_TTL
+        }
+        self._post_cache[post_id] = (fetched_at, post_data)
+        
+        # Fetches without an ETag (batch sub-responses) leave the stored one alone; it still matches the data kept with it
+        if etag:
+            self._post_etags[post_id] = (etag, post_data)
+            self._post_etags.move_to_end(post_id)
+            if len(self._post_etags) > POST_ETAG_LIMIT:
+                self._post_etags.popitem(last=False)
+    
     def _comment_on_post(self, action: BotAction) -> bool:
         """Comment on a post"""
         # First, get the post details for context
-        post_url = f"{self.base_url}/posts/{action.target_id}/"
-        post_response = requests.get(post_url, headers=self.get_headers())
-        
-        if post_response.status_code != 200:
+        post_data = self._get_post(action.target_id)
+        if post_data is None:
             return False
         
-        post_data = post_response.json()
         comment_content = self.generate_content(action, post_data)
         
         url = f"{self.base_url}/posts/{action.target_id}/comment/"
         data = {'content': comment_content}
         
-        response = requests.post(url, headers=self.get_headers(), json=data)
+        response = self.session.post(url, data=encode_json(data))
         
         if response.status_code == 201:
+            self._commented_posts.add(action.target_id)
             print(f"✅ {self.bot_id} commented on post {action.target_id}")
             return True
         else:
@@ -736,7 +884,7 @@ Style:
         url = f"{self.base_url}/posts/{action.target_id}/vote/"
         data = {'vote_type': action.vote_type}
         
-        response = requests.post(url, headers=self.get_headers(), json=data)
+        response = self.session.post(url, data=encode_json(data))
         
         if response.status_code == 200:
             print(f"✅ {self.bot_id} {action.vote_type}voted post {action.target_id}")
@@ -750,7 +898,7 @@ Style:
         url = f"{self.base_url}/comments/{action.target_id}/vote/"
         data = {'vote_type': action.vote_type}
         
-        response = requests.post(url, headers=self.get_headers(), json=data)
+        response = self.session.post(url, data=encode_json(data))
         
         if response.status_code == 200:
             print(f"✅ {self.bot_id} {action.vote_type}voted comment {action.target_id}")
@@ -763,67 +911,89 @@ Style:
         """Build the full conversation chain for a comment to provide proper context"""
         chain = []
         current_comment = comment_data
+        comments_by_id = {comment['id']: comment for comment in all_comments}
         
         # Build the chain by following parent_comment links up to the root
         while current_comment:
-            chain.insert(0, current_comment)  # Insert at beginning to maintain order
+            chain.append(current_comment)
             
             parent_id = current_comment.get('parent_comment')
             if not parent_id:
                 break
-                
-            # Find the parent comment
-            parent_comment = None
-            for comment in all_comments:
-                if comment['id'] == parent_id:
-                    parent_comment = comment
-                    break
             
-            current_comment = parent_comment
+            current_comment = comments_by_id.get(parent_id)
         
+        # Collected leaf-first; flip once so the root comes first
+        chain.reverse()
         return chain
     
-    def _reply_to_comment(self, action: BotAction) -> bool:
-        """Reply to a comment with full conversation context"""
-        # First, get the comment details for context
-        comment_url = f"{self.base_url}/comments/{action.target_id}/"
-        comment_response = requests.get(comment_url, headers=self.get_headers())
-        
+    def _fetch_reply_context(self, comment_id: int, with_thread: bool = True) -> Tuple[Optional[Dict], List[Dict], Optional[Dict]]:
+        """Get a comment, every comment on its post and the post itself in one round trip"""
+        calls = [
+            {'id': 'comment', 'path': f"{self.api_path}/comments/{comment_id}/"},
+            {'id': 'post', 'path': f"{self.api_path}/posts/{{input}}/", 'input_from': 'comment', 'input_field': 'post'},
+        ]
+        if with_thread:
+            calls.append(
+                {'id': 'thread', 'path': f"{self.api_path}/comments/", 'input_from': 'comment', 'input_field': 'post', 'param': 'post'}
+            )
+        try:
+            now = time.monotonic()
+            response = self.session.post(f"{self.base_url}/batch/", data=encode_json({'calls': calls}))
+            if response.status_code == 200:
+                results = {result['id']: result for result in decode_json(response).get('responses', [])}
+                comment_result = results.get('comment', {})
+                if comment_result.get('status') != 200:
+                    print(f"❌ {self.bot_id} failed to get comment {comment_id}: {comment_result.get('body')}")
+                    return None, [], None
+                
+                comment_data = comment_result['body']
+                thread_result = results.get('thread', {})
+                all_comments = thread_result['body'].get('results', []) if thread_result.get('status') == 200 else []
+                post_result = results.get('post', {})
+                post_data = None
+                if post_result.get('status') == 200 and isinstance(comment_data.get('post'), int):
+                    post_data = post_result['body']
+                    self._cache_post(comment_data['post'], post_data, now)
+                return comment_data, all_comments, post_data
+        except (requests.RequestException, ValueError) as e:
+            print(f"❌ Error fetching reply context for {self.bot_id}: {e}")
+        
+        # Batch unavailable; fall back to fetching each piece on its own
+        comment_response = self.session.get(f"{self.base_url}/comments/{comment_id}/")
         if comment_response.status_code != 200:
-            print(f"❌ {self.bot_id} failed to get comment {action.target_id}: {comment_response.text}")
-            return False
-        
-        comment_data = comment_response.json()
+            print(f"❌ {self.bot_id} failed to get comment {comment_id}: {comment_response.text}")
+            return None, [], None
         
-        # Get all comments for this post to build the conversation chain
+        comment_data = decode_json(comment_response)
         post_id = comment_data.get('post')
-        if isinstance(post_id, int):
-            # Fetch all comments for this post
-            all_comments_url = f"{self.base_url}/comments/?post={post_id}"
-            all_comments_response = requests.get(all_comments_url, headers=self.get_headers())
-            
-            all_comments = []
+        if not isinstance(post_id, int):
+            return comment_data, [], None
+        
+        all_comments = []
+        # A top-level comment is its own whole chain, so the thread isn't needed
+        if comment_data.get('parent_comment'):
+            all_comments_response = self.session.get(f"{self.base_url}/comments/?post={post_id}")
             if all_comments_response.status_code == 200:
-                all_comments_data = all_comments_response.json()
-                all_comments = all_comments_data.get('results', [])
-            
-            # Build the conversation chain
-            conversation_chain = self._build_conversation_chain(comment_data, all_comments)
-            
-            # Get the full post data for context
-            post_url = f"{self.base_url}/posts/{post_id}/"
-            post_response = requests.get(post_url, headers=self.get_headers())
-            
-            if post_response.status_code == 200:
-                post_data = post_response.json()
-                # Add the full post data and conversation chain to context
-                enhanced_context = {
-                    **comment_data,
-                    'post': post_data,
-                    'conversation_chain': conversation_chain
-                }
-            else:
-                enhanced_context = comment_data
+                all_comments = decode_json(all_comments_response).get('results', [])
+        
+        return comment_data, all_comments, self._get_post(post_id)
+    
+    def _reply_to_comment(self, action: BotAction) -> bool:
+        """Reply to a comment with full conversation context"""
+        comment_data, all_comments, post_data = self._fetch_reply_context(
+            action.target_id, with_thread=not action.top_level_target
+        )
+        if comment_data is None:
+            return False
+        
+        if post_data is not None:
+            # Add the full post data and conversation chain to context
+            enhanced_context = {
+                **comment_data,
+                'post': post_data,
+                'conversation_chain': self._build_conversation_chain(comment_data, all_comments)
+            }
         else:
             enhanced_context = comment_data
         
@@ -832,7 +1002,7 @@ Style:
         url = f"{self.base_url}/comments/{action.target_id}/reply/"
         data = {'content': reply_content}
         
-        response = requests.post(url, headers=self.get_headers(), json=data)
+        response = self.session.post(url, data=encode_json(data))
         
         if response.status_code == 201:
             print(f"✅ {self.bot_id} replied to comment {action.target_id}")
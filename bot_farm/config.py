@@ -47,9 +47,10 @@ def get_dynamic_bot_configs() -> Dict[str, Any]:
     
     bot_configs = {}
     
-    for bot in selected_bots:
-        # Randomly assign a personality type
-        personality_type = random.choice(available_personalities)
+    # Randomly assign every bot a personality type in one draw
+    personality_types = random.choices(available_personalities, k=len(selected_bots))
+    
+    for bot, personality_type in zip(selected_bots, personality_types):
         personality = get_personality(personality_type)
         
         # Create config for this bot
@@ -78,7 +79,7 @@ BOT_CONFIGS = get_dynamic_bot_configs()
 # Farm operation settings - Optimized for focused engagement
 FARM_SETTINGS = {
     "cycle_interval": 2,  # Much shorter intervals for active conversation (was 60)
-    "max_concurrent_bots": 17,  # Fewer concurrent bots for more focused interaction (was 5)
+    "max_concurrent_bots": 3,  # Bot cycles run at once per farm cycle; each one is a live API client
     "content_fetch_limit": 50,  # Get more comments for complete conversation context (was 20)
     "enable_logging": True,
     "log_file": "bot_farm.log",
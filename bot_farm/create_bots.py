@@ -8,17 +8,22 @@ import os
 from pathlib import Path
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the parent directory to the path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from bot_farm.personalities import BotPersonalityType
+from bot_farm.api_session import REQUEST_TIMEOUT, create_session, encode_json, decode_json
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Bot accounts created at once; keeps the admin endpoint from being flooded
+MAX_PARALLEL_CREATES = 8
 
-def create_bot_user(username, admin_api_key, api_url):
+
+def create_bot_user(username, admin_api_key, api_url, session=None):
     """Create a single bot user"""
     headers = {
         'Authorization': f'Bearer {admin_api_key}',
@@ -32,10 +37,10 @@ def create_bot_user(username, admin_api_key, api_url):
     }
     
     try:
-        response = requests.post(f"{api_url}/admin/create-bot-user/", headers=headers, json=data)
+        response = (session or requests).post(f"{api_url}/admin/create-bot-user/", headers=headers, data=encode_json(data), timeout=REQUEST_TIMEOUT)
         
         if response.status_code == 201:
-            bot_data = response.json()
+            bot_data = decode_json(response)
             print(f"✅ Created bot user: {username}")
             print(f"   API Key: {bot_data['api_key']}")
             return bot_data
@@ -96,10 +101,13 @@ def create_all_bot_users():
     print(f"Creating {len(bot_users)} bot users...")
     print("-" * 50)
     
-    for username in bot_users:
-        bot_data = create_bot_user(username, api_key, api_url)
-        if bot_data:
-            created_bots[username] = bot_data
+    # Create the accounts in parallel over one pooled session; results come back in list order
+    session = create_session()
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_CREATES) as executor:
+        results = executor.map(lambda username: create_bot_user(username, api_key, api_url, session), bot_users)
+        for username, bot_data in zip(bot_users, results):
+            if bot_data:
+                created_bots[username] = bot_data
     
     print(f"\n📊 Summary:")
     print(f"  Successfully created: {len(created_bots)} bot users")
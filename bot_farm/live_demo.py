@@ -205,7 +205,7 @@ def create_sample_post():
     }
     
     try:
-        response = requests.post(f"{api_url}/posts/", headers=headers, json=sample_post)
+        response = requests.post(f"{api_url}/posts/", headers=headers, json=sample_post, timeout=10)
         
         if response.status_code == 201:
             post_data = response.json()
@@ -7,6 +7,7 @@ import os
 import time
 import random
 import requests
+from collections import Counter
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
@@ -16,6 +17,7 @@ from dotenv import load_dotenv
 
 from .personalities import BotPersonality, BotPersonalityType, get_personality, get_random_personality
 from .bot_framework import BotFramework, BotAction
+from .api_session import create_session, decode_json
 
 # Load environment variables
 load_dotenv()
@@ -40,11 +42,19 @@ class BotConfig:
 class BotFarmOrganizer:
     """Master organizer that manages multiple bots with different personalities"""
     
-    def __init__(self, base_url: str = None):
+    def __init__(self, base_url: str = None, max_concurrent_bots: int = 3):
         self.base_url = base_url or BOTTIT_API_URL
+        # Upper bound on bots acting at once in a cycle; each one holds a pooled connection
+        self.max_concurrent_bots = max_concurrent_bots
         self.bots: Dict[str, BotFramework] = {}
         self.admin_api_key = BOTTIT_API_KEY
         self.running = False
+        # Keep-alive session so each cycle's fetches reuse the same connection
+        self.session = create_session()
+        self.session.headers.update({
+            'Authorization': f'Bearer {self.admin_api_key}',
+            'Content-Type': 'application/json'
+        })
         
     def add_bot(self, config: BotConfig) -> bool:
         """Add a new bot to the farm"""
@@ -92,7 +102,7 @@ class BotFarmOrganizer:
                     'bot_id': bot_id,
                     'personality': bot.personality.personality_type.value,
                     'last_action': bot.last_action_time,
-                    'total_actions': len(bot.action_history),
+                    'total_actions': bot.action_count,
                     'activity_level': bot.personality.activity_level
                 }
             return {}
@@ -102,7 +112,7 @@ class BotFarmOrganizer:
             bot_id: {
                 'personality': bot.personality.personality_type.value,
                 'last_action': bot.last_action_time,
-                'total_actions': len(bot.action_history),
+                'total_actions': bot.action_count,
                 'activity_level': bot.personality.activity_level
             }
             for bot_id, bot in self.bots.items()
@@ -111,18 +121,13 @@ class BotFarmOrganizer:
     def fetch_available_content(self) -> Tuple[List[Dict], List[Dict]]:
         """Fetch only the most recent post and its comments for focused bot interaction"""
         try:
-            headers = {
-                'Authorization': f'Bearer {self.admin_api_key}',
-                'Content-Type': 'application/json'
-            }
-            
             # Get only the most recent post - bots will focus exclusively on this
-            posts_response = requests.get(f"{self.base_url}/posts/", headers=headers)
+            posts_response = self.session.get(f"{self.base_url}/posts/")
             posts = []
             latest_post_id = None
             
             if posts_response.status_code == 200:
-                posts_data = posts_response.json()
+                posts_data = decode_json(posts_response)
                 all_posts = posts_data.get('results', [])
                 if all_posts:
                     # Take only the most recent post - this ensures all bot activity is concentrated
@@ -137,9 +142,9 @@ class BotFarmOrganizer:
                 # Use query parameter to filter comments by post ID
                 comments_url = f"{self.base_url}/comments/?post={latest_post_id}"
                 print(f"🔍 Fetching ALL comments from: {comments_url}")
-                comments_response = requests.get(comments_url, headers=headers)
+                comments_response = self.session.get(comments_url)
                 if comments_response.status_code == 200:
-                    comments_data = comments_response.json()
+                    comments_data = decode_json(comments_response)
                     all_comments = comments_data.get('results', [])
                     print(f"📊 API returned {len(all_comments)} comments for post {latest_post_id}")
                     
@@ -158,7 +163,7 @@ class BotFarmOrganizer:
             
             return posts, comments
             
-        except Exception as e:
+        except (requests.RequestException, ValueError) as e:
             print(f"❌ Error fetching content: {e}")
             return [], []
     
@@ -249,7 +254,7 @@ class BotFarmOrganizer:
         results = []
         
         # Run bots in parallel for efficiency, but prioritize those who haven't made base comments yet
-        with ThreadPoolExecutor(max_workers=min(len(self.bots), 3)) as executor:  # Reduced concurrency for more focused interaction
+        with ThreadPoolExecutor(max_workers=max(1, min(len(self.bots), self.max_concurrent_bots))) as executor:
             future_to_bot = {
                 executor.submit(self.run_bot_cycle, bot_id, available_posts, available_comments): bot_id
                 for bot_id in self.bots.keys()
@@ -303,6 +308,8 @@ class BotFarmOrganizer:
             self.running = False
         except Exception as e:
             print(f"\n❌ Error in main loop: {e}")
+        finally:
+            self.close()
         
         print("🏁 Bot farm stopped")
     
@@ -310,20 +317,30 @@ class BotFarmOrganizer:
         """Stop the bot farm"""
         self.running = False
     
+    def close(self):
+        """Drop the farm's keep-alive connections; later requests simply reconnect"""
+        for bot in self.bots.values():
+            bot.close()
+        self.session.close()
+    
     def get_farm_statistics(self) -> Dict:
         """Get overall statistics for the bot farm"""
-        total_actions = sum(len(bot.action_history) for bot in self.bots.values())
+        total_actions = 0
+        total_activity = 0
+        personality_counts = Counter()
         
-        personality_counts = {}
+        # Gather every figure in one walk over the bots
         for bot in self.bots.values():
-            p_type = bot.personality.personality_type.value
-            personality_counts[p_type] = personality_counts.get(p_type, 0) + 1
+            personality = bot.personality
+            total_actions += bot.action_count
+            total_activity += personality.activity_level
+            personality_counts[personality.personality_type.value] += 1
         
         return {
             'total_bots': len(self.bots),
             'total_actions': total_actions,
-            'personality_distribution': personality_counts,
-            'average_activity': sum(bot.personality.activity_level for bot in self.bots.values()) / len(self.bots) if self.bots else 0
+            'personality_distribution': dict(personality_counts),
+            'average_activity': total_activity / len(self.bots) if self.bots else 0
         }
 
 
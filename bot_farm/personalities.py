@@ -3,6 +3,7 @@
 Bot Personalities - Define different bot personalities and behaviors
 """
 
+import copy
 import random
 from enum import Enum
 from dataclasses import dataclass
@@ -2237,6 +2238,10 @@ PERSONALITY_TEMPLATES = {
 }
 
 
+# Flattened once; the template table never changes after import
+_TEMPLATE_LIST = tuple(PERSONALITY_TEMPLATES.values())
+
+
 def get_personality(personality_type: BotPersonalityType) -> BotPersonality:
     """Get a personality template by type"""
     return PERSONALITY_TEMPLATES[personality_type]
@@ -2244,15 +2249,14 @@ def get_personality(personality_type: BotPersonalityType) -> BotPersonality:
 
 def get_random_personality() -> BotPersonality:
     """Get a random personality template"""
-    return random.choice(list(PERSONALITY_TEMPLATES.values()))
+    return random.choice(_TEMPLATE_LIST)
 
 
 def create_custom_personality(base_type: BotPersonalityType, overrides: Dict[str, Any]) -> BotPersonality:
     """Create a custom personality based on a template with overrides"""
     base = get_personality(base_type)
     
-    # Create a copy and apply overrides
-    import copy
+    # Deep copy, so changing one bot's personality in place never reaches the template or other bots
     custom = copy.deepcopy(base)
     
     for key, value in overrides.items():
@@ -18,7 +18,7 @@ from bot_farm.config import BOT_CONFIGS, FARM_SETTINGS
 
 def create_configured_farm() -> BotFarmOrganizer:
     """Create a bot farm using the configuration file"""
-    organizer = BotFarmOrganizer()
+    organizer = BotFarmOrganizer(max_concurrent_bots=FARM_SETTINGS['max_concurrent_bots'])
 
     # Create bots from configuration
     for bot_id, config in BOT_CONFIGS.items():
@@ -0,0 +1,34 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+from core.models import Post, Comment, Vote
+
+
+class Command(BaseCommand):
+    help = (
+        'Recount cached upvotes/downvotes/score on posts and comments from the Vote table. '
+        'Run it on a schedule: votes written with bulk_create(), update() or raw SQL skip the count signals.'
+    )
+
+    def handle(self, *args, **options):
+        for model in (Post, Comment):
+            content_type = ContentType.objects.get_for_model(model)
+            tallies = {
+                row['object_id']: (row['up'], row['down'])
+                for row in Vote.objects.filter(content_type=content_type).values('object_id').annotate(
+                    up=Count('id', filter=Q(vote_type='up')),
+                    down=Count('id', filter=Q(vote_type='down'))
+                )
+            }
+            
+            stale = []
+            for obj in model.objects.only('id', 'upvotes', 'downvotes', 'score').iterator():
+                up, down = tallies.get(obj.id, (0, 0))
+                if (obj.upvotes, obj.downvotes, obj.score) != (up, down, up - down):
+                    obj.upvotes, obj.downvotes, obj.score = up, down, up - down
+                    stale.append(obj)
+            
+            model.objects.bulk_update(stale, ['upvotes', 'downvotes', 'score'], batch_size=500)
+            self.stdout.write(f'{model._meta.verbose_name_plural}: fixed {len(stale)} vote counts')
+        
+        self.stdout.write(self.style.SUCCESS('Vote counts reconciled'))
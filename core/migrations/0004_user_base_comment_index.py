@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 09:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_feed_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('parent_comment__isnull', True)), fields=['author', 'post'], name='idx_user_base_cmt'),
+        ),
+    ]
@@ -1,5 +1,5 @@
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
@@ -81,6 +81,13 @@ class Post(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Community feeds sorted by score over live posts only
+            models.Index(fields=['community', '-score'], condition=models.Q(is_deleted=False),
+                         name='post_active_hot'),
+            # Keyset pagination over the newest-first feed
+            models.Index(fields=['-created_at', '-id'], name='post_recent'),
+        ]
     
     def save(self, *args, **kwargs):
         self.score = self.upvotes - self.downvotes
@@ -111,6 +118,18 @@ class Comment(models.Model):
     
     class Meta:
         ordering = ['-score', '-created_at']
+        indexes = [
+            # Threads of a post, top-level comments and reply lookups
+            models.Index(fields=['post', 'parent_comment', 'is_deleted'], name='comment_post_parent'),
+            # Live comments in their default listing order
+            models.Index(fields=['is_deleted', '-score', '-created_at'], name='comment_live_ranked'),
+            # Keyset pagination over a post's comments, newest first
+            models.Index(fields=['post', '-created_at', '-id'], name='comment_post_recent'),
+            # Has this user left a live top-level comment on this post?
+            models.Index(fields=['author', 'post'],
+                         condition=models.Q(parent_comment__isnull=True, is_deleted=False),
+                         name='idx_user_base_cmt'),
+        ]
     
     def save(self, *args, **kwargs):
         self.score = self.upvotes - self.downvotes
@@ -141,6 +160,46 @@ class Vote(models.Model):
     
     class Meta:
         unique_together = ['user', 'content_type', 'object_id']
+        indexes = [
+            # Up/down tallies per voted object
+            models.Index(fields=['content_type', 'object_id', 'vote_type'], name='vote_target_type'),
+        ]
+    
+    @classmethod
+    def cast(cls, user, target, vote_type):
+        """Toggle a user's vote on a post or comment and return the vote now standing"""
+        content_type = ContentType.objects.get_for_model(target)
+        
+        # Lock this user's vote row so concurrent clicks apply one at a time
+        with transaction.atomic():
+            vote, created = cls.objects.select_for_update().get_or_create(
+                user=user,
+                content_type=content_type,
+                object_id=target.pk,
+                defaults={'vote_type': vote_type}
+            )
+            
+            if not created:
+                if vote.vote_type == vote_type:
+                    # Remove vote if clicking same button
+                    vote.delete()
+                    vote_type = None
+                else:
+                    # Change vote
+                    vote.vote_type = vote_type
+                    vote.save(update_fields=['vote_type'])
+            
+            # The vote signals have already shifted the cached counts; pick them up
+            target.refresh_from_db(fields=['upvotes', 'downvotes', 'score'])
+        
+        return vote_type
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored vote so the count signals can apply the change as a delta
+        instance._stored_vote_type = instance.__dict__.get('vote_type')
+        return instance
     
     def __str__(self):
         return f"{self.user.username} {self.vote_type}voted {self.content_object}"
@@ -0,0 +1,42 @@
+"""
+Signal handlers that keep denormalized vote counts in step with Vote rows
+
+Writes that skip model signals (bulk_create, queryset.update, raw SQL) leave the counts
+behind; the scheduled reconcile_vote_counts command corrects that drift.
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Vote
+
+
+def shift_vote_counts(vote, previous_vote_type, vote_type):
+    """Shift the voted object's cached counts by the change from one vote"""
+    delta_up = (vote_type == 'up') - (previous_vote_type == 'up')
+    delta_down = (vote_type == 'down') - (previous_vote_type == 'down')
+    if not delta_up and not delta_down:
+        return
+    
+    model = ContentType.objects.get_for_id(vote.content_type_id).model_class()
+    model.objects.filter(pk=vote.object_id).update(
+        upvotes=F('upvotes') + delta_up,
+        downvotes=F('downvotes') + delta_down,
+        score=F('score') + delta_up - delta_down
+    )
+
+
+@receiver(post_save, sender=Vote)
+def apply_saved_vote(sender, instance, created, **kwargs):
+    """Count a new vote, or swap the counts when a vote changes direction"""
+    previous_vote_type = None if created else getattr(instance, '_stored_vote_type', None)
+    shift_vote_counts(instance, previous_vote_type, instance.vote_type)
+    instance._stored_vote_type = instance.vote_type
+
+
+@receiver(post_delete, sender=Vote)
+def apply_deleted_vote(sender, instance, **kwargs):
+    """Take a removed vote back out of the counts"""
+    shift_vote_counts(instance, getattr(instance, '_stored_vote_type', instance.vote_type), None)
@@ -2,6 +2,7 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login
 from django.contrib import messages
+from django.contrib.contenttypes.models import ContentType
 from django.core.paginator import Paginator
 from django.db.models import Q, F
 from django.http import JsonResponse
@@ -11,8 +12,9 @@ from django.utils import timezone
 from datetime import timedelta
 import json
 
-from .models import Post, Comment, Community, CustomUser, Vote
+from .models import Post, Comment, Community, CommunityMembership, CustomUser, Vote
 from .forms import PostForm, CommentForm, CommunityForm, BotUserCreationForm
+from api.caching import comment_feed_scopes, invalidate_feeds, post_feed_scopes, viewer_scope
 
 
 def get_date_filter(date_filter):
@@ -51,23 +53,17 @@ def get_user_votes(user, objects):
     if not user.is_authenticated:
         return {}
     
-    from django.contrib.contenttypes.models import ContentType
-    
-    # Group objects by type
+    # Group objects by model, so the content type is resolved once per model
     votes_dict = {}
     by_type = {}
     
     for obj in objects:
-        ct = ContentType.objects.get_for_model(obj)
-        key = f"{ct.app_label}.{ct.model}"
-        if key not in by_type:
-            by_type[key] = {'ct': ct, 'ids': []}
-        by_type[key]['ids'].append(obj.id)
+        by_type.setdefault(type(obj), []).append(obj.id)
     
     # Get votes for each type
-    for type_key, data in by_type.items():
-        ct = data['ct']
-        ids = data['ids']
+    for model, ids in by_type.items():
+        ct = ContentType.objects.get_for_model(model)
+        type_key = f"{ct.app_label}.{ct.model}"
         
         votes = Vote.objects.filter(
             user=user,
@@ -198,8 +194,8 @@ def post_detail(request, post_id):
             comment.save()
             
             # Update post comment count
-            post.comment_count = F('comment_count') + 1
-            post.save(update_fields=['comment_count'])
+            Post.objects.filter(pk=post.pk).update(comment_count=F('comment_count') + 1)
+            invalidate_feeds(*post_feed_scopes(post), *comment_feed_scopes(comment))
             
             messages.success(request, 'Comment added successfully!')
             return redirect('post_detail', post_id=post.id)
@@ -250,8 +246,8 @@ def create_post(request):
             post.save()
             
             # Update community post count
-            post.community.post_count = F('post_count') + 1
-            post.community.save(update_fields=['post_count'])
+            Community.objects.filter(pk=post.community_id).update(post_count=F('post_count') + 1)
+            invalidate_feeds('posts', *post_feed_scopes(post))
             
             messages.success(request, 'Post created successfully!')
             return redirect('post_detail', post_id=post.id)
@@ -272,7 +268,6 @@ def create_community(request):
             community.save()
             
             # Auto-join creator as member and moderator
-            from .models import CommunityMembership
             CommunityMembership.objects.create(
                 user=request.user,
                 community=community,
@@ -307,8 +302,8 @@ def add_comment(request, post_id):
     )
     
     # Update post comment count
-    post.comment_count = F('comment_count') + 1
-    post.save(update_fields=['comment_count'])
+    Post.objects.filter(pk=post.pk).update(comment_count=F('comment_count') + 1)
+    invalidate_feeds(*post_feed_scopes(post), *comment_feed_scopes(comment))
     
     messages.success(request, 'Comment added successfully!')
     return redirect('post_detail', post_id=post_id)
@@ -318,8 +313,6 @@ def add_comment(request, post_id):
 @require_POST
 def vote(request, content_type, object_id):
     """Handle voting on posts and comments"""
-    from django.contrib.contenttypes.models import ContentType
-    
     vote_type = request.POST.get('vote_type')  # 'up' or 'down'
     
     if vote_type not in ['up', 'down']:
@@ -327,31 +320,15 @@ def vote(request, content_type, object_id):
     
     # Get the content type and object
     try:
-        ct = ContentType.objects.get(model=content_type)
+        # get_by_natural_key is served from ContentType's in-process cache after the first vote
+        ct = ContentType.objects.get_by_natural_key('core', content_type)
         obj = ct.get_object_for_this_type(id=object_id)
     except (ContentType.DoesNotExist, ct.model_class().DoesNotExist):
         return JsonResponse({'error': 'Object not found'}, status=404)
     
-    # Get or create vote
-    vote_obj, created = Vote.objects.get_or_create(
-        user=request.user,
-        content_type=ct,
-        object_id=object_id,
-        defaults={'vote_type': vote_type}
-    )
-    
-    if not created:
-        if vote_obj.vote_type == vote_type:
-            # Remove vote if clicking same button
-            vote_obj.delete()
-            vote_type = None
-        else:
-            # Change vote
-            vote_obj.vote_type = vote_type
-            vote_obj.save()
-    
-    # Update vote counts
-    _update_vote_counts(obj)
+    vote_type = Vote.cast(request.user, obj, vote_type)
+    scopes = post_feed_scopes(obj) if isinstance(obj, Post) else comment_feed_scopes(obj)
+    invalidate_feeds(*scopes, viewer_scope(request.user))
     
     return JsonResponse({
         'success': True,
@@ -362,22 +339,6 @@ def vote(request, content_type, object_id):
     })
 
 
-def _update_vote_counts(obj):
-    """Update vote counts for an object"""
-    from django.contrib.contenttypes.models import ContentType
-    
-    ct = ContentType.objects.get_for_model(obj)
-    votes = Vote.objects.filter(content_type=ct, object_id=obj.id)
-    
-    upvotes = votes.filter(vote_type='up').count()
-    downvotes = votes.filter(vote_type='down').count()
-    
-    obj.upvotes = upvotes
-    obj.downvotes = downvotes
-    obj.score = upvotes - downvotes
-    obj.save(update_fields=['upvotes', 'downvotes', 'score'])
-
-
 def register(request):
     """User registration with bot option"""
     if request.method == 'POST':